@@ -9,9 +9,18 @@ from flasgger import Swagger  # 新增
 from resume.controller import resume_bp
 from models import group
 from models import project
+from models import data_version
+from models import project_deletion
+from models import project_recommendation_change
 from group.controller import group_bp
 from project.controller import project_bp
 from recommend.controller import recommend_bp
+from utils.data_version_utils import ensure_data_versions
+from utils.schema_utils import add_missing_columns
+from recommend.worker import init_recommend_worker
+from recommend.service import RecommendService
+from utils.blob_store import configure_blob_store
+from utils.project_utils import configure_parse_workers
 
 
 def create_app():
@@ -47,6 +56,8 @@ def create_app():
     with app.app_context():
         try:
             db.create_all()
+            add_missing_columns()
+            ensure_data_versions()
             print("数据库表创建成功！")
         except Exception as e:
             print(f"数据库初始化失败: {e}")
@@ -55,15 +66,31 @@ def create_app():
             time.sleep(5)  # 等待5秒后重试
             try:
                 db.create_all()
+                add_missing_columns()
+                ensure_data_versions()
                 print("数据库表重试创建成功！")
             except Exception as e2:
                 print(f"数据库重试初始化失败: {e2}")
 
+    # 项目 PDF 的内容寻址存储
+    configure_blob_store(app.config.get('PROJECT_BLOB_DIR'))
+    configure_parse_workers(app.config.get('PROJECT_PARSE_WORKERS', 1))
+
+    # 多进程共享推荐快照，并启动推荐预计算后台线程
+    RecommendService.configure_snapshot_store(app.config.get('RECOMMEND_SNAPSHOT_DIR'))
+    RecommendService.configure_matrix_backend(app.config.get('RECOMMEND_MATRIX_BACKEND', 'dense'))
+    RecommendService.configure_result_cache(app.config.get('RECOMMEND_RESULT_CACHE_SIZE', 1024))
+    RecommendService.configure_recompute_workers(app.config.get('RECOMMEND_RECOMPUTE_WORKERS', 1))
+    init_recommend_worker(app)
+
     return app
 
 
 # 创建应用实例
-app = create_app()
+# 以 python app.py 启动时，forkserver / spawn 启动的子进程会以 __mp_main__ 的名字重新导入本文件，
+# 子进程只做解析或计算，不能再创建应用（连接数据库、启动推荐后台线程）
+if __name__ != '__mp_main__':
+    app = create_app()
 
 # 应用入口点
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+技能向量回填脚本
+为已有的简历、组员、项目记录计算并保存技能向量；
+技能词表或强度规则变化（向量版本号变化）后重新运行即可刷新过期记录
+
+用法: python backfill_skill_vectors.py [--all] [--batch-size 500]
+"""
+
+import argparse
+import os
+from sqlalchemy import or_
+
+
+def backfill(model, text_column, force=False, batch_size=500):
+    """
+    为一张表回填技能向量
+    Args:
+        model: 模型类（StudentResume / GroupMember / Project）
+        text_column: 技能文本所在列
+        force: 为 True 时忽略版本号，全部重新计算
+    Returns:
+        int: 更新的记录数
+    """
+    from models.user import db
+    from recommend.service import compute_skill_vector, SKILL_VECTOR_VERSION
+
+    # 只查需要的列，不加载大字段；保留 updated_at 原值，回填不算业务更新
+    columns = [model.id, text_column]
+    has_updated_at = hasattr(model, 'updated_at')
+    if has_updated_at:
+        columns.append(model.updated_at)
+    query = db.session.query(*columns)
+    if not force:
+        query = query.filter(or_(
+            model.skill_vector.is_(None),
+            model.skill_vector_version.is_(None),
+            model.skill_vector_version != SKILL_VECTOR_VERSION
+        ))
+    rows = query.all()
+
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        mappings = []
+        for row in rows[start:start + batch_size]:
+            skill_vector, skill_vector_version = compute_skill_vector(row[1])
+            mapping = {'id': row[0], 'skill_vector': skill_vector, 'skill_vector_version': skill_vector_version}
+            if has_updated_at:
+                mapping['updated_at'] = row[2]
+            mappings.append(mapping)
+        db.session.bulk_update_mappings(model, mappings)
+        db.session.commit()
+        updated += len(mappings)
+    print(f"{model.__tablename__}: 更新 {updated} 条")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='回填技能向量')
+    parser.add_argument('--all', action='store_true', help='忽略版本号，全部重新计算')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    # 回填脚本不需要应用内的后台预计算线程
+    os.environ.setdefault('RECOMMEND_WORKER_ENABLED', '0')
+    from app import app
+    from models.student_resume import StudentResume
+    from models.group import GroupMember
+    from models.project import Project
+
+    with app.app_context():
+        backfill(StudentResume, StudentResume.skill, args.all, args.batch_size)
+        backfill(GroupMember, GroupMember.skill, args.all, args.batch_size)
+        backfill(Project, Project.required_skills, args.all, args.batch_size)
+    print("技能向量回填完成！")
+
+
+if __name__ == "__main__":
+    main()
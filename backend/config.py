@@ -50,6 +50,41 @@ class Config:
     # JWT token的过期时间（小时）
     JWT_EXPIRATION_HOURS = 24
     
+    # ==================== 推荐预计算配置 ====================
+    # 是否启动后台线程，在简历、小组、项目变化后重新计算并保存推荐分数
+    RECOMMEND_WORKER_ENABLED = os.environ.get('RECOMMEND_WORKER_ENABLED', '1') == '1'
+
+    # 静默期（秒）：连续写入合并为一次计算
+    RECOMMEND_WORKER_DEBOUNCE = float(os.environ.get('RECOMMEND_WORKER_DEBOUNCE', 2))
+
+    # 最长等待（秒）：持续有写入时也至少每隔这么久计算一次
+    RECOMMEND_WORKER_MAX_DELAY = float(os.environ.get('RECOMMEND_WORKER_MAX_DELAY', 30))
+
+    # 多个 worker 进程共享的推荐快照目录（mmap 加载），设为空字符串则各进程独立加载
+    RECOMMEND_SNAPSHOT_DIR = os.environ.get(
+        'RECOMMEND_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recommend_snapshots')
+    )
+
+    # 推荐评分矩阵后端：dense（numpy）或 sparse（scipy.sparse，适合很大的技能词表）
+    RECOMMEND_MATRIX_BACKEND = os.environ.get('RECOMMEND_MATRIX_BACKEND', 'dense')
+
+    # 启动时是否先为所有组计算一次
+    RECOMMEND_PRECOMPUTE_ON_START = os.environ.get('RECOMMEND_PRECOMPUTE_ON_START', '1') == '1'
+
+    # 单组推荐结果 LRU 缓存的容量（条目数），为 0 时不缓存
+    RECOMMEND_RESULT_CACHE_SIZE = int(os.environ.get('RECOMMEND_RESULT_CACHE_SIZE', 1024))
+
+    # 全量重算推荐的进程数，大于1时按组分块多进程并行（子进程由 forkserver 启动，快照随初始化参数传入）
+    RECOMMEND_RECOMPUTE_WORKERS = int(os.environ.get('RECOMMEND_RECOMPUTE_WORKERS', 1))
+
+    # 批量上传项目文件时并行解析的进程数上限，为 1 时在请求进程中逐个解析
+    PROJECT_PARSE_WORKERS = int(os.environ.get('PROJECT_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+
+    # 项目 PDF 等文件的内容寻址存储目录（按 SHA-256 存放）
+    PROJECT_BLOB_DIR = os.environ.get(
+        'PROJECT_BLOB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blob_store')
+    )
+    
     # ==================== 教师秘钥配置 ====================
     # 教师注册和登录的统一秘钥
     # 所有教师都使用这个秘钥进行身份验证
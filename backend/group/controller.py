@@ -104,17 +104,28 @@ def delete_group_by_name(group_name):
         deleted_recommendations = GroupProjectRecommendation.query.filter_by(group_id=group_id).count()
         deleted_members = GroupMember.query.filter_by(group_id=group_id).count()
 
-        # 3. 删除推荐记录
+        # 3. 删除推荐记录，并记下这些项目的推荐有变化（项目列表增量同步据此返回）；
+        # 先递增 recommendations 版本号，与后台重算的写入按同一行锁串行
+        from utils.data_version_utils import bump_data_version, MEMBERS, RECOMMENDATIONS
+        from project.dao import mark_recommendations_changed
+        bump_data_version(RECOMMENDATIONS)
+        affected_projects = [
+            row[0] for row in db.session.query(GroupProjectRecommendation.project_id).filter_by(group_id=group_id)
+        ]
         GroupProjectRecommendation.query.filter_by(group_id=group_id).delete()
+        mark_recommendations_changed(affected_projects)
         
         # 4. 删除组员记录
         GroupMember.query.filter_by(group_id=group_id).delete()
         
         # 5. 删除小组
         db.session.delete(group)
+        written_version = bump_data_version(MEMBERS)[MEMBERS]
         
         # 6. 提交所有更改
         db.session.commit()
+        from recommend.service import RecommendService
+        RecommendService.remove_group(group_id, written_version)
         
         return jsonify({
             'status': '200',
@@ -279,6 +290,21 @@ def get_all_groups_with_recommendations():
         type: string
         required: true
         description: Bearer token
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: 逗号分隔的返回字段（groupName, groupMembers, recommendProjects），不传返回全部字段
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: 每页返回的组数，不传则返回全部
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: 上一页返回的 nextCursor
     responses:
       200:
         description: 查询成功
@@ -288,6 +314,9 @@ def get_all_groups_with_recommendations():
             status:
               type: string
               example: "200"
+            nextCursor:
+              type: string
+              description: 下一页的游标，没有下一页时为 null
             groups:
               type: array
               items:
@@ -323,6 +352,10 @@ def get_all_groups_with_recommendations():
                           type: string
                         rank:
                           type: integer
+      304:
+        description: 数据未变化（If-None-Match / If-Modified-Since 与当前 ETag / Last-Modified 一致）
+      400:
+        description: 参数错误
       401:
         description: 未授权或token无效
     """
@@ -334,5 +367,18 @@ def get_all_groups_with_recommendations():
         return jsonify({'error': 'token无效'}), 401
 
     from . import service as group_service
-    groups = group_service.get_all_groups_with_members_and_recommendations()
-    return jsonify({'status': '200', 'groups': groups}) 
\ No newline at end of file
+    from utils.request_utils import parse_fields, parse_page_args
+    fields, error = parse_fields(group_service.GROUP_LIST_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    limit, cursor, error = parse_page_args()
+    if error:
+        return jsonify({'error': error}), 400
+    from utils.conditional_utils import apply_validators, check_not_modified
+    from utils.data_version_utils import MEMBERS, PROFILES, PROJECTS, RECOMMENDATIONS
+    # 组列表显示组员姓名、专业、技能原文（PROFILES）
+    not_modified, validators = check_not_modified(MEMBERS, PROFILES, PROJECTS, RECOMMENDATIONS)
+    if not_modified:
+        return not_modified
+    groups, next_cursor = group_service.get_all_groups_with_members_and_recommendations(fields, limit, cursor)
+    return apply_validators(jsonify({'status': '200', 'groups': groups, 'nextCursor': next_cursor}), validators) 
\ No newline at end of file
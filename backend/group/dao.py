@@ -1,5 +1,6 @@
 from models.group import Group, GroupMember
 from models.user import db
+from utils.data_version_utils import bump_data_version, MEMBERS
 
 def group_name_exists(group_name):
     return Group.query.filter_by(group_name=group_name).first() is not None
@@ -11,18 +12,23 @@ def create_group_and_members(group_name, members):
     group = Group(group_name=group_name)
     db.session.add(group)
     db.session.flush()  # 获取group.id
+    from recommend.service import compute_skill_vector
     group_member_objs = []
     for m in members:
+        skill_vector, skill_vector_version = compute_skill_vector(m.get('skill', ''))
         group_member = GroupMember(
             group_id=group.id, 
             user_id=m['user_id'], 
             name=m['name'], 
             email=m['email'],
-            skill=m.get('skill', '')  # 添加技能字段
+            skill=m.get('skill', ''),  # 添加技能字段
+            skill_vector=skill_vector,  # 预计算的技能向量
+            skill_vector_version=skill_vector_version
         )
         db.session.add(group_member)
         group_member_objs.append(group_member)
-    return group, group_member_objs
+    written_version = bump_data_version(MEMBERS)[MEMBERS]
+    return group, group_member_objs, written_version
 
 def commit_or_rollback():
     try:
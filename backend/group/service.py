@@ -21,9 +21,14 @@ def build_group_members(emails):
 
 def create_group_with_members(group_name, emails):
     members = build_group_members(emails)
-    group, group_member_objs = group_dao.create_group_and_members(group_name, members)
+    group, group_member_objs, written_version = group_dao.create_group_and_members(group_name, members)
     if not group_dao.commit_or_rollback():
         return None, '有成员已加入其他组'
+    # 只增量更新新组员的技能向量
+    from recommend.service import RecommendService
+    from recommend.worker import enqueue_recompute
+    RecommendService.upsert_members([m.user_id for m in group_member_objs], written_version)
+    enqueue_recompute([group.id])
     group_member_dict = {m['name']: m['email'] for m in members}
     return {'groupName': group_name, 'groupMember': group_member_dict}, None
 
@@ -41,72 +46,110 @@ def get_user_group_info(user_id):
         'groupMembers': group_member_dict 
     } 
 
-def get_all_groups_with_members_and_recommendations():
+# /staff/groups 可返回的字段
+GROUP_LIST_FIELDS = ('groupName', 'groupMembers', 'recommendProjects')
+
+def get_all_groups_with_members_and_recommendations(fields=None, limit=None, cursor=None):
     """
     优化版：批量查询所有小组、组员、简历、推荐项目和项目详情，避免N+1查询，极大提升性能。
-    返回结构与原来完全一致。
+    只查询所选字段需要的表；按组ID分页。
+    Args:
+        fields: 返回的字段集合，None 表示全部
+        limit: 本页最多返回的组数，None 表示不分页
+        cursor: 上一页最后一个组的ID，从它之后开始
+    Returns:
+        (groups, next_cursor): 每个组的结构与原来一致；没有下一页时 next_cursor 为 None
     """
-    from . import dao as group_dao
     from models.project import Project
     from models.group import Group, GroupMember
     from models.student_resume import StudentResume
     from models.group_project_recommendation import GroupProjectRecommendation
+    from models.user import db
+
+    if fields is None:
+        fields = set(GROUP_LIST_FIELDS)
 
-    # 1. 批量查所有小组
-    groups = Group.query.all()
+    # 1. 批量查本页的小组（按ID排序，多取一条判断是否还有下一页）
+    query = db.session.query(Group.id, Group.group_name)
+    if cursor is not None:
+        query = query.filter(Group.id > cursor)
+    query = query.order_by(Group.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    groups = query.all()
+    next_cursor = None
+    if limit is not None and len(groups) > limit:
+        groups = groups[:limit]
+        next_cursor = str(groups[-1].id)
     group_ids = [g.id for g in groups]
 
-    # 2. 批量查所有组员
-    all_members = GroupMember.query.filter(GroupMember.group_id.in_(group_ids)).all() if group_ids else []
     members_by_group = {}
-    user_ids = set()
-    for m in all_members:
-        members_by_group.setdefault(m.group_id, []).append(m)
-        user_ids.add(m.user_id)
+    resume_map = {}
+    if 'groupMembers' in fields and group_ids:
+        # 2. 批量查所有组员（不取技能向量等列）
+        all_members = db.session.query(
+            GroupMember.group_id, GroupMember.user_id, GroupMember.name, GroupMember.email, GroupMember.skill
+        ).filter(GroupMember.group_id.in_(group_ids)).order_by(GroupMember.id).all()
+        user_ids = set()
+        for m in all_members:
+            members_by_group.setdefault(m.group_id, []).append(m)
+            user_ids.add(m.user_id)
 
-    # 3. 批量查所有简历
-    resumes = StudentResume.query.filter(StudentResume.user_id.in_(user_ids)).all() if user_ids else []
-    resume_map = {r.user_id: r for r in resumes}
+        # 3. 批量查所有简历
+        resumes = db.session.query(
+            StudentResume.id, StudentResume.user_id, StudentResume.skill, StudentResume.major
+        ).filter(StudentResume.user_id.in_(user_ids)).all() if user_ids else []
+        resume_map = {r.user_id: r for r in resumes}
 
-    # 4. 批量查所有推荐项目
-    all_recs = GroupProjectRecommendation.query.filter(GroupProjectRecommendation.group_id.in_(group_ids)).order_by(GroupProjectRecommendation.rank).all() if group_ids else []
     recs_by_group = {}
-    project_ids = set()
-    for rec in all_recs:
-        recs_by_group.setdefault(rec.group_id, []).append(rec)
-        project_ids.add(rec.project_id)
+    project_map = {}
+    if 'recommendProjects' in fields and group_ids:
+        # 4. 批量查所有推荐项目
+        all_recs = db.session.query(
+            GroupProjectRecommendation.group_id, GroupProjectRecommendation.project_id,
+            GroupProjectRecommendation.final_score, GroupProjectRecommendation.rank
+        ).filter(GroupProjectRecommendation.group_id.in_(group_ids)).order_by(GroupProjectRecommendation.rank).all()
+        project_ids = set()
+        for rec in all_recs:
+            recs_by_group.setdefault(rec.group_id, []).append(rec)
+            project_ids.add(rec.project_id)
 
-    # 5. 批量查所有项目详情
-    projects = Project.query.filter(Project.id.in_(project_ids)).all() if project_ids else []
-    project_map = {p.id: p for p in projects}
+        # 5. 批量查所有项目详情（只取编号和标题）
+        projects = db.session.query(Project.id, Project.project_number, Project.project_title).filter(
+            Project.id.in_(project_ids)
+        ).all() if project_ids else []
+        project_map = {p.id: p for p in projects}
 
     # 6. 组装返回数据
     result = []
     for group in groups:
-        member_list = []
-        for m in members_by_group.get(group.id, []):
-            resume = resume_map.get(m.user_id)
-            member_list.append({
-                'name': m.name,
-                'skill': m.skill or (resume.skill if resume else ''),
-                'email': m.email,
-                'major': resume.major if resume else '',
-                'resume': resume.id if resume else ''
-            })
-        rec_projects = []
-        for rec in recs_by_group.get(group.id, []):
-            project = project_map.get(rec.project_id)
-            if not project:
-                continue
-            rec_projects.append({
-                'projectNumber': project.project_number,
-                'projectTitle': project.project_title,
-                'final_score': f"{rec.final_score:.4f}",
-                'rank': rec.rank
-            })
-        result.append({
-            'groupName': group.group_name,
-            'groupMembers': member_list,
-            'recommendProjects': rec_projects
-        })
-    return result 
\ No newline at end of file
+        item = {}
+        if 'groupName' in fields:
+            item['groupName'] = group.group_name
+        if 'groupMembers' in fields:
+            member_list = []
+            for m in members_by_group.get(group.id, []):
+                resume = resume_map.get(m.user_id)
+                member_list.append({
+                    'name': m.name,
+                    'skill': m.skill or (resume.skill if resume else ''),
+                    'email': m.email,
+                    'major': resume.major if resume else '',
+                    'resume': resume.id if resume else ''
+                })
+            item['groupMembers'] = member_list
+        if 'recommendProjects' in fields:
+            rec_projects = []
+            for rec in recs_by_group.get(group.id, []):
+                project = project_map.get(rec.project_id)
+                if not project:
+                    continue
+                rec_projects.append({
+                    'projectNumber': project.project_number,
+                    'projectTitle': project.project_title,
+                    'final_score': f"{rec.final_score:.4f}",
+                    'rank': rec.rank
+                })
+            item['recommendProjects'] = rec_projects
+        result.append(item)
+    return result, next_cursor
@@ -3,6 +3,11 @@
 数据库初始化脚本
 """
 
+import os
+
+# 建表脚本不需要应用内的后台预计算线程；Config 在导入时读取环境变量，必须在导入前设置
+os.environ.setdefault('RECOMMEND_WORKER_ENABLED', '0')
+
 import pymysql
 from config import Config
 
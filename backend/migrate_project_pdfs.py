@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+项目 PDF 迁移脚本
+把 projects.pdf_base64 列中的 PDF 解码后写入内容寻址的 blob 存储，只在表里保留摘要、大小和类型；
+没有 base64 内容但 staff_project 目录下有原文件的项目也一并补齐。
+全部迁移成功后可加 --drop-column 删除 pdf_base64 列；
+加 --gc 时再清理 blob 存储中没有任何项目引用的 PDF（项目删除、重新上传时来不及删除的旧文件）
+
+用法: python migrate_project_pdfs.py [--batch-size 50] [--drop-column] [--gc [--gc-grace 3600]]
+"""
+
+import argparse
+import base64
+import mimetypes
+import os
+
+
+def migrate(batch_size=50):
+    """
+    迁移所有还没有 pdf_sha256 的项目
+    Returns:
+        (migrated, missing): 迁移成功的项目数、记录了 PDF 文件但找不到内容的项目数
+    """
+    from sqlalchemy import bindparam, inspect, text
+    from models.user import db
+    from models.project import Project
+    from project.dao import store_project_pdf
+    from utils.blob_store import get_blob_store
+
+    has_base64 = 'pdf_base64' in {c['name'] for c in inspect(db.engine).get_columns(Project.__tablename__)}
+    store = get_blob_store()
+    project_ids = [row[0] for row in db.session.query(Project.id).filter(Project.pdf_sha256.is_(None)).all()]
+
+    migrated = missing = 0
+    for start in range(0, len(project_ids), batch_size):
+        batch = project_ids[start:start + batch_size]
+        # pdf_base64 已不在模型中，用原生 SQL 分批读取，避免一次把所有大字段读进内存
+        contents = {}
+        if has_base64:
+            rows = db.session.execute(
+                text("SELECT id, pdf_base64 FROM projects WHERE id IN :ids AND pdf_base64 IS NOT NULL")
+                .bindparams(bindparam('ids', expanding=True)),
+                {'ids': batch}
+            ).all()
+            contents = {row[0]: row[1] for row in rows}
+
+        mappings = []
+        projects = Project.query.filter(Project.id.in_(batch)).all()
+        for project in projects:
+            project_id = project.id
+            blob = None
+            if contents.get(project_id):
+                data = base64.b64decode(contents[project_id])
+                sha256, size = store.put(data)
+                mime = mimetypes.guess_type(project.pdf_file or '')[0] or 'application/pdf'
+                blob = (sha256, size, mime)
+            elif project.pdf_file:
+                blob = store_project_pdf(project.pdf_file)
+                if blob is None:
+                    missing += 1
+            if blob is None:
+                continue
+            # 保留 updated_at 原值，迁移不算业务更新
+            mappings.append({
+                'id': project_id, 'pdf_sha256': blob[0], 'pdf_size': blob[1], 'pdf_mime': blob[2],
+                'updated_at': project.updated_at
+            })
+        db.session.bulk_update_mappings(Project, mappings)
+        db.session.commit()
+        migrated += len(mappings)
+    print(f"projects: 迁移 {migrated} 个 PDF，{missing} 个项目找不到 PDF 内容")
+    return migrated, missing
+
+
+def drop_base64_column():
+    """删除 projects.pdf_base64 列（MySQL 不再保存 PDF 二进制内容）"""
+    from sqlalchemy import inspect, text
+    from models.user import db
+
+    if 'pdf_base64' not in {c['name'] for c in inspect(db.engine).get_columns('projects')}:
+        print("pdf_base64 列已不存在")
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE projects DROP COLUMN pdf_base64"))
+    print("已删除 projects.pdf_base64 列")
+
+
+def gc_blobs(grace_seconds):
+    """删除没有任何项目引用、且最近 grace_seconds 秒内没有写入过的 PDF blob"""
+    from project.dao import gc_project_pdfs
+
+    deleted, kept = gc_project_pdfs(grace_seconds)
+    print(f"blob 清理: 删除 {deleted} 个未引用的 PDF，保留 {kept} 个仍被引用的 PDF")
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把项目 PDF 从 projects 表迁移到 blob 存储')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--drop-column', action='store_true', help='迁移完成后删除 pdf_base64 列')
+    parser.add_argument('--gc', action='store_true', help='迁移完成后删除没有项目引用的 PDF blob')
+    parser.add_argument('--gc-grace', type=int, default=None,
+                        help='只删除这么多秒之前写入的 blob，避开尚未提交的上传（默认 3600）')
+    args = parser.parse_args()
+
+    # 迁移脚本不需要应用内的后台预计算线程
+    os.environ.setdefault('RECOMMEND_WORKER_ENABLED', '0')
+    from app import app
+
+    with app.app_context():
+        migrate(args.batch_size)
+        # 有 base64 内容的行都已写入 blob 存储（写入失败会直接抛出异常），删除列不会丢失数据
+        if args.drop_column:
+            drop_base64_column()
+        if args.gc:
+            from project.dao import PDF_BLOB_GRACE_SECONDS
+            gc_blobs(PDF_BLOB_GRACE_SECONDS if args.gc_grace is None else args.gc_grace)
+    print("项目 PDF 迁移完成！")
+
+
+if __name__ == "__main__":
+    main()
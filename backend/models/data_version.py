@@ -0,0 +1,17 @@
+from models.user import db
+from datetime import datetime, timezone, timedelta
+
+def get_australia_time():
+    """获取澳洲东部时间（AEST/AEDT）"""
+    australia_tz = timezone(timedelta(hours=10))  # UTC+10
+    return datetime.now(australia_tz)
+
+class DataVersion(db.Model):
+    """
+    数据版本号：每个范围（scope）一行，相关数据写入时递增
+    各进程只需比较版本号即可判断缓存是否过期
+    """
+    __tablename__ = 'data_versions'
+    scope = db.Column(db.String(32), primary_key=True)  # 数据范围，如 members / projects
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=get_australia_time, onupdate=get_australia_time)
@@ -15,4 +15,6 @@ class GroupMember(db.Model):
     user_id = db.Column(db.Integer, nullable=False, unique=True)  # 一个成员只能加入一个组
     name = db.Column(db.String(128), nullable=False)
     email = db.Column(db.String(128), nullable=False) 
-    skill = db.Column(db.Text, nullable=True) 
\ No newline at end of file
+    skill = db.Column(db.Text, nullable=True)
+    skill_vector = db.Column(db.LargeBinary, nullable=True)  # 预计算的技能向量（uint8，按技能词表展开）
+    skill_vector_version = db.Column(db.String(16), nullable=True)  # 计算时的词表版本，不一致时需重新计算 
\ No newline at end of file
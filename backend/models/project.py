@@ -1,6 +1,5 @@
 from models.user import db
 from datetime import datetime, timezone, timedelta
-from sqlalchemy.dialects.mysql import LONGTEXT
 def get_australia_time():
     """获取澳洲东部时间（AEST/AEDT）"""
     australia_tz = timezone(timedelta(hours=10))  # UTC+10
@@ -15,6 +14,12 @@ class Project(db.Model):
     group_capacity = db.Column(db.String(32), nullable=False)
     project_requirements = db.Column(db.Text, nullable=False)
     required_skills = db.Column(db.Text, nullable=False)
+    skill_vector = db.Column(db.LargeBinary, nullable=True)  # 预计算的技能向量（uint8，按技能词表展开）
+    skill_vector_version = db.Column(db.String(16), nullable=True)  # 计算时的词表版本，不一致时需重新计算
     pdf_file = db.Column(db.String(1024), nullable=True)
-    pdf_base64 = db.Column(LONGTEXT, nullable=True)  # 使用MySQL的LONGTEXT类型，支持大文件base64
-    updated_at = db.Column(db.DateTime, default=get_australia_time, onupdate=get_australia_time)    
+    # PDF 内容存放在按 SHA-256 寻址的 blob 存储（utils/blob_store.py），表里只记摘要、大小和类型
+    pdf_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    pdf_size = db.Column(db.Integer, nullable=True)
+    pdf_mime = db.Column(db.String(128), nullable=True)
+    # 建索引：项目列表的增量同步按 updated_at 过滤
+    updated_at = db.Column(db.DateTime, default=get_australia_time, onupdate=get_australia_time, index=True)
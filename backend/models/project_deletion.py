@@ -0,0 +1,16 @@
+from models.user import db
+from datetime import datetime, timezone, timedelta
+
+def get_australia_time():
+    """获取澳洲东部时间（AEST/AEDT）"""
+    australia_tz = timezone(timedelta(hours=10))  # UTC+10
+    return datetime.now(australia_tz)
+
+class ProjectDeletion(db.Model):
+    """
+    项目删除记录（墓碑）：项目列表的增量同步据此告诉客户端哪些项目已被删除
+    每个项目编号只保留最近一次删除的时间
+    """
+    __tablename__ = 'project_deletions'
+    project_number = db.Column(db.String(32), primary_key=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=get_australia_time, index=True)
@@ -0,0 +1,16 @@
+from models.user import db
+from datetime import datetime, timezone, timedelta
+
+def get_australia_time():
+    """获取澳洲东部时间（AEST/AEDT）"""
+    australia_tz = timezone(timedelta(hours=10))  # UTC+10
+    return datetime.now(australia_tz)
+
+class ProjectRecommendationChange(db.Model):
+    """
+    项目推荐记录的变化时间：后台重算或删除小组使某个项目的推荐分数、推荐组变化时更新，
+    项目列表的增量同步据此返回 topGroups / final_score 有变化的项目；每个项目只保留最近一次变化的时间
+    """
+    __tablename__ = 'project_recommendation_changes'
+    project_id = db.Column(db.Integer, primary_key=True)
+    changed_at = db.Column(db.DateTime, nullable=False, default=get_australia_time, index=True)
@@ -14,5 +14,7 @@ class StudentResume(db.Model):
     email = db.Column(db.String(128))
     major = db.Column(db.String(128))
     skill = db.Column(db.String(256))
+    skill_vector = db.Column(db.LargeBinary, nullable=True)  # 预计算的技能向量（uint8，按技能词表展开）
+    skill_vector_version = db.Column(db.String(16), nullable=True)  # 计算时的词表版本，不一致时需重新计算
     # resume_file = db.Column(db.String(256))  # 新增字段，存储简历文件名或URL
     updated_at = db.Column(db.DateTime, default=get_australia_time, onupdate=get_australia_time) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, send_from_directory
+from flask import Blueprint, request, jsonify, send_from_directory, send_file, Response
 from utils.jwt_utils import verify_token
 from . import service as project_service
 import os
@@ -37,6 +37,7 @@ def convert_to_local_time(time_obj):
 def upload_staff_projects():
     """
     批量上传项目PDF，自动提取项目信息并存库，返回解析结果
+    文件在进程池中并行解析，所有项目在一个事务中写入；单个文件失败不影响其他文件，逐文件结果见 results
     ---
     tags:
       - 项目
@@ -82,6 +83,23 @@ def upload_staff_projects():
                     type: string
                   pdfFile:
                     type: string
+            results:
+              type: array
+              description: 与上传文件顺序一致的逐文件结果
+              items:
+                type: object
+                properties:
+                  filename:
+                    type: string
+                  status:
+                    type: string
+                    enum: [ok, error]
+                  projectNumber:
+                    type: string
+                    description: 成功时返回
+                  error:
+                    type: string
+                    description: 失败时返回的错误信息
       400:
         description: 参数错误
       401:
@@ -99,20 +117,9 @@ def upload_staff_projects():
     if not files:
         return jsonify({'error': '未选择文件'}), 400
     upload_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../staff_project'))
-    projects = []
-    from . import service as project_service
-    for file in files:
-        filename = file.filename
-        file_path = os.path.join(upload_dir, filename)
-        file.save(file_path)
-        from utils.project_utils import parse_project_pdf
-        info = parse_project_pdf(file_path, filename)
-        api_path = f"/api/files/project/{filename}"
-        info['pdfFile'] = api_path
-        # 新增：保存到数据库（会自动存base64）
-        project_service.save_project_to_db(info, api_path)
-        projects.append(info)
-    return jsonify({'status': '200', 'projects': projects})
+    # 并行解析、一个事务批量写入（PDF 内容写入 blob 存储）；失败的文件记在 results 中，不影响其他文件
+    projects, results = project_service.save_projects_from_files(files, upload_dir)
+    return jsonify({'status': '200', 'projects': projects, 'results': results})
 
 
 @project_bp.route('/staff/projects', methods=['PUT'])
@@ -276,6 +283,26 @@ def get_projects():
         type: string
         required: true
         description: Bearer token
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: 逗号分隔的返回字段，如 projectNumber,projectTitle,final_score；不传返回全部字段
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: 每页返回的项目数，不传则返回全部
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: 上一页返回的 nextCursor
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: 增量同步，传上次返回的 syncedAt（ISO 8601），只返回之后新增或更新的项目（含推荐分数有变化的项目）以及被删除的项目
     responses:
       200:
         description: 获取成功
@@ -285,6 +312,23 @@ def get_projects():
             status:
               type: string
               example: "200"
+            nextCursor:
+              type: string
+              description: 下一页的游标，没有下一页时为 null
+            syncedAt:
+              type: string
+              description: 下次增量同步时作为 since 传回（分页时用第一页返回的值）
+              example: "2024-07-01T22:34:46+10:00"
+            deleted:
+              type: array
+              description: 只在传了 since 时返回（且只在第一页），since 之后被删除的项目
+              items:
+                type: object
+                properties:
+                  projectNumber:
+                    type: string
+                  deletedAt:
+                    type: string
             projects:
               type: array
               items:
@@ -311,10 +355,14 @@ def get_projects():
                   pdfFile:
                     type: string
                     example: "/api/files/1751360465_-.pdf"
-                  pdf:
+                  pdfUrl:
                     type: string
-                    description: "PDF文件的base64编码二进制数据"
-                    example: "JVBERi0xLjQKJcOkw7zDtsO..."
+                    description: "PDF下载地址（按内容SHA-256寻址），没有PDF时为 null"
+                    example: "/api/files/blobs/3f7a...e91c"
+                  pdfSize:
+                    type: integer
+                    description: "PDF文件大小（字节）"
+                    example: 482133
                   updatetime:
                     type: string
                     example: "2024-07-01T22:34:56+10:00"
@@ -353,7 +401,8 @@ def get_projects():
                 projectRequirements: "Develop an intelligent recommendation system supporting multiple algorithms."
                 requiredSkills: "Python, Machine Learning"
                 pdfFile: "/api/files/1751360465_-.pdf"
-                pdf: "JVBERi0xLjQKJcOkw7zDtsO..."
+                pdfUrl: "/api/files/blobs/3f7a...e91c"
+                pdfSize: 482133
                 updatetime: "2024-07-01T22:34:56+10:00"
                 final_score: "0.95"
                 match_score: "0.85"
@@ -372,7 +421,8 @@ def get_projects():
                 projectRequirements: "Build a big data analytics platform with real-time data processing capabilities."
                 requiredSkills: "Java, Hadoop, Spark"
                 pdfFile: "/api/files/1751360465_-.pdf"
-                pdf: "JVBERi0xLjQKJcOkw7zDtsO..."
+                pdfUrl: "/api/files/blobs/3f7a...e91c"
+                pdfSize: 482133
                 updatetime: "2024-07-01T22:34:56+10:00"
                 final_score: "0.88"
                 match_score: "0.80"
@@ -384,6 +434,10 @@ def get_projects():
                     score: 0.85
                   - groupName: "Team Gamma"
                     score: 0.80
+      304:
+        description: 数据未变化（If-None-Match / If-Modified-Since 与当前 ETag / Last-Modified 一致）
+      400:
+        description: 参数错误
       401:
         description: 未授权或token无效
     """
@@ -393,11 +447,42 @@ def get_projects():
     payload = verify_token(token)
     if not payload:
         return jsonify({'error': 'token无效'}), 401
-    projects = project_service.get_projects_service()
-    return jsonify({
+    from utils.request_utils import parse_fields, parse_page_args, parse_since_arg
+    from utils.time_utils import get_australia_time
+    from .dao import PROJECT_LIST_FIELDS
+    fields, error = parse_fields(PROJECT_LIST_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    limit, cursor, error = parse_page_args()
+    if error:
+        return jsonify({'error': error}), 400
+    since, error = parse_since_arg()
+    if error:
+        return jsonify({'error': error}), 400
+    from utils.conditional_utils import apply_validators, check_not_modified
+    from utils.data_version_utils import MEMBERS, PROJECTS, RECOMMENDATIONS
+    # topGroups 中有组名，组变化也会影响项目列表
+    not_modified, validators = check_not_modified(PROJECTS, RECOMMENDATIONS, MEMBERS)
+    if not_modified:
+        return not_modified
+    # 在查询之前取同步时间，并往前留一段重叠，避免漏掉查询时尚未提交的写入（重复返回的项目按编号覆盖即可）
+    synced_at = convert_to_local_time(get_australia_time() - project_service.SYNC_OVERLAP)
+    if since is None:
+        projects, next_cursor = project_service.get_projects_service(fields, limit, cursor)
+        return apply_validators(jsonify({
+            'status': '200',
+            'projects': projects,
+            'nextCursor': next_cursor,
+            'syncedAt': synced_at
+        }), validators)
+    projects, deleted, next_cursor = project_service.get_project_changes_service(since, fields, limit, cursor)
+    return apply_validators(jsonify({
         'status': '200',
-        'projects': projects
-    })
+        'projects': projects,
+        'deleted': deleted,
+        'nextCursor': next_cursor,
+        'syncedAt': synced_at
+    }), validators)
 
 
 @project_bp.route('/project/<int:projectNumber>', methods=['GET'])
@@ -495,5 +580,74 @@ def get_project_pdf(filename):
     uploads_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../staff_project'))
     print('查找路径:', uploads_dir, '文件名:', repr(filename), flush=True)
     print('目录下文件:', [repr(f) for f in os.listdir(uploads_dir)], flush=True)
-    return send_from_directory(uploads_dir, filename) 
+    return send_from_directory(uploads_dir, filename)
+
 
+@project_bp.route('/files/blobs/<sha256>', methods=['GET'])
+def get_project_blob(sha256):
+    """
+    按内容摘要下载项目PDF（流式返回，支持 Range 分段下载和 ETag 条件请求）
+    ---
+    tags:
+      - 项目
+    produces:
+      - application/pdf
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token
+      - name: sha256
+        in: path
+        type: string
+        required: true
+        description: 文件内容的 SHA-256（即项目列表中的 pdfUrl）
+      - name: Range
+        in: header
+        type: string
+        required: false
+        description: 分段下载，如 bytes=0-1023
+    responses:
+      200:
+        description: 文件内容
+      206:
+        description: 分段内容
+      304:
+        description: 内容未变化（If-None-Match 命中）
+      401:
+        description: 未授权或token无效
+      404:
+        description: 文件不存在
+    """
+    token = get_token_from_header()
+    if not token:
+        return jsonify({'error': '未授权'}), 401
+    payload = verify_token(token)
+    if not payload:
+        return jsonify({'error': 'token无效'}), 401
+    from utils.blob_store import get_blob_store, is_blob_key
+    if not is_blob_key(sha256):
+        return jsonify({'error': '文件不存在'}), 404
+    info = project_service.get_pdf_blob_info(sha256)
+    store = get_blob_store()
+    if not info or not store.exists(sha256):
+        return jsonify({'error': '文件不存在'}), 404
+    size, mime = info
+
+    # 内容寻址：同一地址的内容永远不变，摘要直接作为强 ETag，可长期缓存
+    path = store.local_path(sha256)
+    if path:
+        # send_file 负责 Content-Length、Range（206）和 If-None-Match（304），按块流式读取文件
+        response = send_file(path, mimetype=mime, conditional=True, etag=sha256, max_age=31536000)
+        response.headers['Accept-Ranges'] = 'bytes'
+    else:
+        def stream():
+            with store.open(sha256) as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b''):
+                    yield chunk
+        response = Response(stream(), mimetype=mime, headers={'Content-Length': str(size)})
+        response.set_etag(sha256)
+        response = response.make_conditional(request)
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
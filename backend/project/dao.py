@@ -1,8 +1,15 @@
 from models.project import Project
 from models.user import db
+from utils.data_version_utils import bump_data_version, PROJECTS
 from datetime import datetime, timezone, timedelta
 import os
-import base64
+import time
+import mimetypes
+from utils.blob_store import get_blob_store
+from sqlalchemy import or_
+
+# 最近写入过的 PDF blob 可能属于尚未提交的上传，清理时先保留
+PDF_BLOB_GRACE_SECONDS = 3600
 
 def convert_to_local_time(time_obj):
     """将时间对象转换为澳洲东部时间字符串"""
@@ -19,110 +26,345 @@ def convert_to_local_time(time_obj):
     local_time = time_obj.astimezone(australia_tz)
     return local_time.isoformat()
 
-def get_pdf_base64(pdf_file_path):
+def resolve_project_pdf_path(pdf_file_path):
+    """API 路径或文件名 -> staff_project 目录下的本地文件路径"""
+    if pdf_file_path.startswith('/api/files/project/'):
+        filename = pdf_file_path.replace('/api/files/project/', '')
+    else:
+        filename = pdf_file_path
+    staff_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../staff_project'))
+    return os.path.join(staff_project_dir, filename)
+
+def store_project_pdf(pdf_file_path):
     """
-    读取PDF文件并转换为base64编码
+    把项目 PDF 写入内容寻址的 blob 存储
     Args:
-        pdf_file_path: str, PDF文件路径
+        pdf_file_path: str, API 路径或文件名
     Returns:
-        str: base64编码的PDF数据，如果文件不存在则返回None
+        (sha256, size, mime)，文件不存在或读取失败时返回 None
     """
     if not pdf_file_path:
         return None
-    
     try:
-        # 从API路径中提取文件名
-        if pdf_file_path.startswith('/api/files/project/'):
-            filename = pdf_file_path.replace('/api/files/project/', '')
-        else:
-            filename = pdf_file_path
-        
-        # 构建完整的文件路径
-        staff_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../staff_project'))
-        full_path = os.path.join(staff_project_dir, filename)
-        
-        # 检查文件是否存在
+        full_path = resolve_project_pdf_path(pdf_file_path)
         if not os.path.exists(full_path):
             print(f"PDF文件不存在: {full_path}")
             return None
-        
-        # 读取文件并转换为base64
-        with open(full_path, 'rb') as pdf_file:
-            pdf_data = pdf_file.read()
-            pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-            return pdf_base64
-            
+        sha256, size = get_blob_store().put_file(full_path)
+        mime = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        return sha256, size, mime
     except Exception as e:
-        print(f"读取PDF文件失败: {e}")
+        print(f"保存PDF文件失败: {e}")
         return None
 
+def _delete_stale_blobs(store, keys, cutoff):
+    """删除最近写入时间早于 cutoff 的 blob（删除前再查一次时间，缩小与并发上传的竞争窗口）"""
+    deleted = 0
+    for key in keys:
+        try:
+            modified_at = store.modified_at(key)
+            if modified_at is not None and modified_at < cutoff and store.delete(key):
+                deleted += 1
+        except OSError as e:
+            print(f"删除PDF文件失败: {e}")
+    return deleted
+
+def release_project_pdfs(keys):
+    """
+    项目删除或重新上传换了 PDF 后（提交之后调用），删除不再被任何项目引用的 PDF blob
+    Args:
+        keys: 原来引用的 sha256 列表
+    Returns:
+        int: 删除的 blob 数
+    """
+    keys = {key for key in keys if key}
+    if not keys:
+        return 0
+    referenced = {
+        row[0] for row in db.session.query(Project.pdf_sha256).filter(Project.pdf_sha256.in_(keys)).distinct()
+    }
+    return _delete_stale_blobs(get_blob_store(), sorted(keys - referenced), time.time() - PDF_BLOB_GRACE_SECONDS)
+
+def gc_project_pdfs(grace_seconds=PDF_BLOB_GRACE_SECONDS):
+    """
+    清理 blob 存储中没有任何项目引用的 PDF（例如删除时跳过的最近写入的 blob、引用检查上线前遗留的文件）
+    Returns:
+        (deleted, kept): 删除的 blob 数、仍被引用的 blob 数
+    """
+    store = get_blob_store()
+    referenced = {
+        row[0] for row in db.session.query(Project.pdf_sha256).filter(Project.pdf_sha256.isnot(None)).distinct()
+    }
+    cutoff = time.time() - grace_seconds
+    candidates = []
+    kept = 0
+    for key, modified_at in store.list_blobs():
+        if key in referenced:
+            kept += 1
+        elif modified_at < cutoff:
+            candidates.append(key)
+    return _delete_stale_blobs(store, candidates, cutoff), kept
+
+def pdf_url(sha256):
+    """PDF 的下载地址（内容寻址，内容不变地址就不变，可长期缓存）"""
+    return f"/api/files/blobs/{sha256}" if sha256 else None
+
+def get_pdf_blob_info(sha256):
+    """
+    按摘要查 PDF 的大小和类型
+    Returns:
+        (size, mime)，没有项目引用该文件时返回 None
+    """
+    row = db.session.query(Project.pdf_size, Project.pdf_mime).filter(Project.pdf_sha256 == sha256).first()
+    return (row.pdf_size, row.pdf_mime) if row else None
+
+def _refresh_recommend_project(project_id, written_version):
+    """项目写入后只增量更新推荐缓存中的这一个项目，并让后台重新计算所有组的推荐"""
+    from recommend.service import RecommendService
+    from recommend.worker import enqueue_recompute
+    RecommendService.upsert_project(project_id, written_version)
+    enqueue_recompute()
+
+def _refresh_recommend_projects(project_ids, written_version):
+    """批量写入后一次增量更新推荐缓存中的这些项目（只发布一个快照），只触发一次后台重算"""
+    from recommend.service import RecommendService
+    from recommend.worker import enqueue_recompute
+    RecommendService.upsert_projects(project_ids, written_version)
+    enqueue_recompute()
+
+# 项目列表可返回的字段 -> 需要查询的列（topGroups、final_score 还需要查推荐分数）
+PROJECT_LIST_FIELDS = {
+    'projectNumber': ('project_number',),
+    'projectTitle': ('project_title',),
+    'clientName': ('client_name',),
+    'groupCapacity': ('group_capacity',),
+    'projectRequirements': ('project_requirements',),
+    'requiredSkills': ('required_skills',),
+    'pdfFile': ('pdf_file',),
+    'pdfUrl': ('pdf_sha256',),
+    'pdfSize': ('pdf_size',),
+    'updatetime': ('updated_at',),
+    'topGroups': ('group_capacity',),
+    'final_score': ('group_capacity',),
+    'match_score': (),
+    'complementarity_score': (),
+}
+
 # 项目相关数据库操作（目前为模拟数据，后续可接数据库）
-def get_all_projects():
-    # 1. 一次性查出所有项目
-    projects = Project.query.all()
+def get_all_projects(fields=None, limit=None, cursor=None, since=None):
+    """
+    项目列表，按项目ID排序
+    Args:
+        fields: 返回的字段集合，None 表示全部；没选的字段对应的列不查询，不需要推荐分数时不查推荐表
+        limit: 本页最多返回的项目数，None 表示不分页
+        cursor: 上一页最后一个项目的ID，从它之后开始
+        since: 只返回在此时间（含）之后新增或更新的项目（无时区的澳洲时间），None 表示全部；
+            选了 topGroups / final_score 时，推荐记录在此之后有变化的项目也一并返回
+    Returns:
+        (projects, next_cursor): 没有下一页时 next_cursor 为 None
+    """
+    if fields is None:
+        fields = set(PROJECT_LIST_FIELDS)
+
+    # 1. 只查所选字段需要的列（PDF 不随列表返回，只给下载地址）
+    column_names = sorted({name for f in fields for name in PROJECT_LIST_FIELDS[f]})
+    query = db.session.query(Project.id, *(getattr(Project, name) for name in column_names))
+    if cursor is not None:
+        query = query.filter(Project.id > cursor)
+    if since is not None:
+        if fields & {'topGroups', 'final_score'}:
+            # 推荐分数的变化不更新项目的 updated_at，另外按推荐记录的变化时间筛选
+            from models.project_recommendation_change import ProjectRecommendationChange
+            changed = db.session.query(ProjectRecommendationChange.project_id).filter(
+                ProjectRecommendationChange.changed_at >= since
+            )
+            query = query.filter(or_(Project.updated_at >= since, Project.id.in_(changed)))
+        else:
+            query = query.filter(Project.updated_at >= since)
+    query = query.order_by(Project.id)
+    if limit is not None:
+        # 多取一条判断是否还有下一页
+        query = query.limit(limit + 1)
+    projects = query.all()
+    next_cursor = None
+    if limit is not None and len(projects) > limit:
+        projects = projects[:limit]
+        next_cursor = str(projects[-1].id)
     if not projects:
-        return []
-    
-    project_ids = [p.id for p in projects]
-    
-    # 2. 批量查出所有推荐分数
-    from models.group_project_recommendation import GroupProjectRecommendation
-    from models.group import Group
-    
-    all_recs = GroupProjectRecommendation.query.filter(
-        GroupProjectRecommendation.project_id.in_(project_ids)
-    ).all()
-    
-    # 3. 批量查出所有组
-    group_ids = list(set([rec.group_id for rec in all_recs]))
+        return [], None
+
+    # 2. 需要时才查本页项目的推荐分数和组名
+    top_recs_by_project = {}
     groups = {}
-    if group_ids:
-        groups = {g.id: g for g in Group.query.filter(Group.id.in_(group_ids)).all()}
-    
-    # 4. 按项目分组推荐数据
-    recs_by_project = {}
-    for rec in all_recs:
-        if rec.project_id not in recs_by_project:
-            recs_by_project[rec.project_id] = []
-        recs_by_project[rec.project_id].append(rec)
-    
-    # 5. 组装结果
+    if fields & {'topGroups', 'final_score'}:
+        from models.group_project_recommendation import GroupProjectRecommendation
+        from models.group import Group
+
+        all_recs = db.session.query(
+            GroupProjectRecommendation.project_id, GroupProjectRecommendation.group_id,
+            GroupProjectRecommendation.final_score
+        ).filter(GroupProjectRecommendation.project_id.in_([p.id for p in projects])).all()
+
+        # 按项目分组推荐数据
+        recs_by_project = {}
+        for rec in all_recs:
+            recs_by_project.setdefault(rec.project_id, []).append(rec)
+
+        # 按分数排序取前N个
+        for p in projects:
+            try:
+                group_capacity = int(p.group_capacity)
+            except (ValueError, TypeError):
+                group_capacity = 3
+            top_recs_by_project[p.id] = sorted(
+                recs_by_project.get(p.id, []), key=lambda x: x.final_score, reverse=True
+            )[:group_capacity]
+
+        # 只查排进前N的组
+        group_ids = list({rec.group_id for recs in top_recs_by_project.values() for rec in recs})
+        if group_ids and 'topGroups' in fields:
+            groups = dict(db.session.query(Group.id, Group.group_name).filter(Group.id.in_(group_ids)).all())
+
+    # 3. 组装结果
     result = []
     for p in projects:
-        project_recs = recs_by_project.get(p.id, [])
-        
-        # 按分数排序取前N个
+        item = {}
+        if 'projectNumber' in fields:
+            item['projectNumber'] = p.project_number
+        if 'projectTitle' in fields:
+            item['projectTitle'] = p.project_title
+        if 'clientName' in fields:
+            item['clientName'] = p.client_name
+        if 'groupCapacity' in fields:
+            item['groupCapacity'] = p.group_capacity
+        if 'projectRequirements' in fields:
+            item['projectRequirements'] = p.project_requirements
+        if 'requiredSkills' in fields:
+            item['requiredSkills'] = p.required_skills
+        if 'pdfFile' in fields:
+            item['pdfFile'] = p.pdf_file
+        if 'pdfUrl' in fields:
+            item['pdfUrl'] = pdf_url(p.pdf_sha256)
+        if 'pdfSize' in fields:
+            item['pdfSize'] = p.pdf_size
+        if 'updatetime' in fields:
+            item['updatetime'] = convert_to_local_time(p.updated_at)
+        top_recs = top_recs_by_project.get(p.id, [])
+        if 'topGroups' in fields:
+            item['topGroups'] = [
+                {'groupName': groups.get(rec.group_id), 'score': rec.final_score} for rec in top_recs
+            ]
+        if 'final_score' in fields:
+            item['final_score'] = str(top_recs[0].final_score) if top_recs else None
+        if 'match_score' in fields:
+            item['match_score'] = None
+        if 'complementarity_score' in fields:
+            item['complementarity_score'] = None
+        result.append(item)
+    return result, next_cursor
+
+def get_deleted_projects(since):
+    """
+    在 since（含）之后删除、且之后没有重新创建的项目
+    Returns:
+        [{'projectNumber', 'deletedAt'}]
+    """
+    from models.project_deletion import ProjectDeletion
+    rows = db.session.query(ProjectDeletion.project_number, ProjectDeletion.deleted_at).filter(
+        ProjectDeletion.deleted_at >= since,
+        ~ProjectDeletion.project_number.in_(db.session.query(Project.project_number))
+    ).order_by(ProjectDeletion.deleted_at).all()
+    return [{'projectNumber': number, 'deletedAt': convert_to_local_time(deleted_at)} for number, deleted_at in rows]
+
+def mark_recommendations_changed(project_ids, chunk_size=1000):
+    """
+    记录这些项目的推荐记录（分数、推荐的组）有变化，在调用方的事务中写入，由调用方提交
+    调用方须先递增 recommendations 版本号：写入按该版本行的行锁串行，先删后插不会主键冲突
+    """
+    from models.project_recommendation_change import ProjectRecommendationChange
+    from utils.time_utils import get_australia_time
+    project_ids = sorted(set(project_ids))
+    now = get_australia_time()
+    for start in range(0, len(project_ids), chunk_size):
+        chunk = project_ids[start:start + chunk_size]
+        ProjectRecommendationChange.query.filter(
+            ProjectRecommendationChange.project_id.in_(chunk)
+        ).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(
+            ProjectRecommendationChange, [{'project_id': project_id, 'changed_at': now} for project_id in chunk]
+        )
+
+def _apply_project_info(project, project_info, pdf_file_path, pdf_blob):
+    """把解析出的项目信息写到 Project 实例上（新建或更新），技能向量在保存时计算一次，推荐加载时直接解码"""
+    from recommend.service import compute_skill_vector
+    skill_vector, skill_vector_version = compute_skill_vector(project_info['requiredSkills'])
+    project.project_title = project_info['projectTitle']
+    project.client_name = project_info['clientName']
+    project.group_capacity = project_info['groupCapacity']
+    project.project_requirements = project_info['projectRequirements']
+    project.required_skills = project_info['requiredSkills']
+    project.skill_vector = skill_vector
+    project.skill_vector_version = skill_vector_version
+    project.pdf_file = pdf_file_path
+    if pdf_blob:
+        project.pdf_sha256, project.pdf_size, project.pdf_mime = pdf_blob
+
+def _replaced_pdf(project, pdf_blob):
+    """重新上传后不再引用的原 PDF 摘要（新建项目或 PDF 未变化时为 None）"""
+    if pdf_blob and project.pdf_sha256 and project.pdf_sha256 != pdf_blob[0]:
+        return project.pdf_sha256
+    return None
+
+def save_projects_to_db(entries):
+    """
+    批量保存项目：一次查出已存在的项目，在同一个事务中新增或更新，只提交一次、只递增一次版本号
+    每个项目在各自的保存点中写入，单个项目写入失败（如字段超长）只回滚这一个，不影响同批其他项目
+    同一批中项目编号重复时，后面的文件覆盖前面的
+    Args:
+        entries: [(project_info, pdf_file_path)]
+    Returns:
+        与 entries 顺序一致的 [(project, error)]，写入失败时 project 为 None、error 为错误信息
+    """
+    numbers = list({info['projectNumber'] for info, _ in entries})
+    projects_by_number = {
+        p.project_number: p for p in Project.query.filter(Project.project_number.in_(numbers)).all()
+    } if numbers else {}
+
+    results = []
+    replaced = []  # 被新 PDF 替换掉的原 PDF 摘要，提交后检查引用再删除
+    for project_info, pdf_file_path in entries:
+        # PDF 内容写入 blob 存储（按内容寻址，重复写入无副作用，不需要随事务回滚）
+        pdf_blob = store_project_pdf(pdf_file_path)
+        project = projects_by_number.get(project_info['projectNumber'])
+        is_new = project is None
         try:
-            group_capacity = int(p.group_capacity)
-        except (ValueError, TypeError):
-            group_capacity = 3
-        
-        top_recs = sorted(project_recs, key=lambda x: x.final_score, reverse=True)[:group_capacity]
-        
-        top_groups = []
-        for rec in top_recs:
-            group = groups.get(rec.group_id)
-            top_groups.append({
-                'groupName': group.group_name if group else None,
-                'score': rec.final_score
-            })
-        
-        result.append({
-            "projectNumber": p.project_number,
-            "projectTitle": p.project_title,
-            "clientName": p.client_name,
-            "groupCapacity": p.group_capacity,
-            "projectRequirements": p.project_requirements,
-            "requiredSkills": p.required_skills,
-            "pdfFile": p.pdf_file,
-            "pdf": p.pdf_base64,  # 直接从数据库取
-            "updatetime": convert_to_local_time(p.updated_at),
-            "topGroups": top_groups,
-            "final_score": str(top_recs[0].final_score) if top_recs else None,
-            "match_score": None,
-            "complementarity_score": None
-        })
-    return result
+            with db.session.begin_nested():
+                if is_new:
+                    project = Project(project_number=project_info['projectNumber'])
+                    db.session.add(project)
+                old_pdf = _replaced_pdf(project, pdf_blob)
+                _apply_project_info(project, project_info, pdf_file_path, pdf_blob)
+                db.session.flush()
+        except Exception as e:
+            print(f"保存项目 {project_info['projectNumber']} 失败: {e}")
+            if not is_new:
+                # 回滚保存点后实例已过期，下次访问时重新加载数据库中的值
+                db.session.expire(project)
+            # 数据库异常的信息带有完整 SQL，只返回第一行
+            results.append((None, f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"))
+            continue
+        projects_by_number[project.project_number] = project
+        results.append((project, None))
+        replaced.append(old_pdf)
+
+    if any(project is not None for project, _ in results):
+        written_version = bump_data_version(PROJECTS)[PROJECTS]
+        db.session.commit()
+        release_project_pdfs(replaced)
+        _refresh_recommend_projects(list({project.id for project, _ in results if project is not None}), written_version)
+    else:
+        db.session.rollback()
+    return results
 
 def save_project_to_db(project_info, pdf_file_path):
     """
@@ -133,47 +375,20 @@ def save_project_to_db(project_info, pdf_file_path):
     Returns:
         Project 实例
     """
-    pdf_base64 = None
-    if pdf_file_path:
-        try:
-            # 兼容API路径和文件名
-            if pdf_file_path.startswith('/api/files/project/'):
-                filename = pdf_file_path.replace('/api/files/project/', '')
-            else:
-                filename = pdf_file_path
-            staff_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../staff_project'))
-            full_path = os.path.join(staff_project_dir, filename)
-            if os.path.exists(full_path):
-                with open(full_path, 'rb') as f:
-                    pdf_base64 = base64.b64encode(f.read()).decode('utf-8')
-        except Exception as e:
-            print(f"读取PDF转base64失败: {e}")
+    # PDF 内容写入 blob 存储，表里只记摘要、大小和类型
+    pdf_blob = store_project_pdf(pdf_file_path)
 
     project = Project.query.filter_by(project_number=project_info['projectNumber']).first()
-    if project:
-        # 已存在，执行更新
-        project.project_title = project_info['projectTitle']
-        project.client_name = project_info['clientName']
-        project.group_capacity = project_info['groupCapacity']
-        project.project_requirements = project_info['projectRequirements']
-        project.required_skills = project_info['requiredSkills']
-        project.pdf_file = pdf_file_path
-        if pdf_base64:
-            project.pdf_base64 = pdf_base64
-    else:
+    if not project:
         # 不存在，插入新项目
-        project = Project(
-            project_number=project_info['projectNumber'],
-            project_title=project_info['projectTitle'],
-            client_name=project_info['clientName'],
-            group_capacity=project_info['groupCapacity'],
-            project_requirements=project_info['projectRequirements'],
-            required_skills=project_info['requiredSkills'],
-            pdf_file=pdf_file_path,
-            pdf_base64=pdf_base64
-        )
+        project = Project(project_number=project_info['projectNumber'])
         db.session.add(project)
+    old_pdf = _replaced_pdf(project, pdf_blob)
+    _apply_project_info(project, project_info, pdf_file_path, pdf_blob)
+    written_version = bump_data_version(PROJECTS)[PROJECTS]
     db.session.commit()
+    release_project_pdfs([old_pdf])
+    _refresh_recommend_project(project.id, written_version)
     return project 
 
 def upsert_project_by_number(info):
@@ -184,6 +399,8 @@ def upsert_project_by_number(info):
     Returns:
         Project 实例
     """
+    from recommend.service import compute_skill_vector
+    skill_vector, skill_vector_version = compute_skill_vector(info['requiredSkills'])
     project = Project.query.filter_by(project_number=info['projectNumber']).first()
     if project:
         project.project_title = info['projectTitle']
@@ -191,6 +408,8 @@ def upsert_project_by_number(info):
         project.group_capacity = info['groupCapacity']
         project.project_requirements = info['projectRequirements']
         project.required_skills = info['requiredSkills']
+        project.skill_vector = skill_vector
+        project.skill_vector_version = skill_vector_version
         project.pdf_file = info.get('pdfFile', project.pdf_file)
     else:
         project = Project(
@@ -200,10 +419,14 @@ def upsert_project_by_number(info):
             group_capacity=info['groupCapacity'],
             project_requirements=info['projectRequirements'],
             required_skills=info['requiredSkills'],
+            skill_vector=skill_vector,
+            skill_vector_version=skill_vector_version,
             pdf_file=info.get('pdfFile', None)
         )
         db.session.add(project)
+    written_version = bump_data_version(PROJECTS)[PROJECTS]
     db.session.commit()
+    _refresh_recommend_project(project.id, written_version)
     return project
 
 def delete_project_by_number(project_number):
@@ -220,8 +443,23 @@ def delete_project_by_number(project_number):
         # 先删除依赖表中的相关数据
         from models.group_project_recommendation import GroupProjectRecommendation
         GroupProjectRecommendation.query.filter_by(project_id=project.id).delete()
+        from models.project_recommendation_change import ProjectRecommendationChange
+        ProjectRecommendationChange.query.filter_by(project_id=project.id).delete()
+        project_id = project.id
+        pdf_sha256 = project.pdf_sha256
         db.session.delete(project)
+        # 记录删除时间，供项目列表增量同步返回墓碑；同一编号只保留最近一次
+        from models.project_deletion import ProjectDeletion
+        from utils.time_utils import get_australia_time
+        db.session.merge(ProjectDeletion(project_number=project.project_number, deleted_at=get_australia_time()))
+        written_version = bump_data_version(PROJECTS)[PROJECTS]
         db.session.commit()
+        # 其他项目仍引用同一份 PDF 内容时保留
+        release_project_pdfs([pdf_sha256])
+        from recommend.service import RecommendService
+        from recommend.worker import enqueue_recompute
+        RecommendService.remove_project(project_id, written_version)
+        enqueue_recompute()
         return True
     return False
 
@@ -1,7 +1,6 @@
 from . import dao as project_dao
-from utils.project_utils import parse_project_pdf
+from utils.project_utils import parse_project_files
 import os
-import traceback
 from datetime import datetime, timezone, timedelta
 
 def convert_to_local_time(time_obj):
@@ -19,45 +18,71 @@ def convert_to_local_time(time_obj):
     local_time = time_obj.astimezone(australia_tz)
     return local_time.isoformat()
 
-def get_projects_service():
-    return project_dao.get_all_projects()
+# 增量同步时间点往前留出的重叠，覆盖同步查询时仍在进行中的写入事务
+SYNC_OVERLAP = timedelta(seconds=10)
+
+def get_projects_service(fields=None, limit=None, cursor=None):
+    """
+    项目列表（字段投影和分页下推到 dao）
+    Returns:
+        (projects, next_cursor)
+    """
+    return project_dao.get_all_projects(fields, limit, cursor)
+
+def get_project_changes_service(since, fields=None, limit=None, cursor=None):
+    """
+    项目列表的增量同步：since 之后新增或更新的项目，以及 since 之后删除的项目（墓碑，只在第一页返回）
+    请求了 topGroups / final_score 时，推荐记录在 since 之后有变化的项目（后台重算、删除小组）也一并返回
+    Args:
+        since: 无时区的澳洲时间
+    Returns:
+        (projects, deleted, next_cursor)
+    """
+    projects, next_cursor = project_dao.get_all_projects(fields, limit, cursor, since)
+    deleted = project_dao.get_deleted_projects(since) if cursor is None else []
+    return projects, deleted, next_cursor
 
 def save_projects_from_files(files, upload_dir):
     """
-    批量保存项目PDF，提取信息并写入数据库
+    批量导入项目文件：先全部保存到磁盘，在进程池中并行解析，再在一个事务中写入数据库
+    单个文件解析或写入失败只记在该文件的结果里，不影响同批其他文件
     Args:
         files: werkzeug FileStorage 列表
         upload_dir: 保存PDF的目录
     Returns:
-        项目信息列表
+        (projects, results): 成功导入的项目信息列表；与 files 顺序一致的逐文件结果
+        {'filename', 'status': 'ok' | 'error', 'projectNumber' 或 'error'}
     """
-    projects = []
     if not os.path.exists(upload_dir):
         os.makedirs(upload_dir)
+    items = []
     for file in files:
         filename = file.filename
         file_path = os.path.join(upload_dir, filename)
         file.save(file_path)
-        try:
-            info = parse_project_pdf(file_path, filename)
-            # 存储API访问路径
-            pdf_api_path = f"/api/files/project/{filename}"
-            project = project_dao.save_project_to_db(info, pdf_api_path)
-            projects.append({
-                'projectNumber': project.project_number,
-                'projectTitle': project.project_title,
-                'clientName': project.client_name,
-                'groupCapacity': project.group_capacity,
-                'projectRequirements': project.project_requirements,
-                'requiredSkills': project.required_skills,
-                'pdfFile': pdf_api_path,
-                'updatetime': convert_to_local_time(project.updated_at),
-            })
-        except Exception as e:
-            print("[FATAL] 数据库写入异常:", e, flush=True)
-            traceback.print_exc()
-            raise
-    return projects 
+        items.append((file_path, filename))
+
+    parsed = parse_project_files(items)
+
+    # 只把解析成功的文件交给数据库批量写入
+    entries = [
+        (info, f"/api/files/project/{filename}")
+        for (_, filename), (info, error) in zip(items, parsed) if error is None
+    ]
+    saved = iter(project_dao.save_projects_to_db(entries))
+
+    projects = []
+    results = []
+    for (_, filename), (info, error) in zip(items, parsed):
+        if error is None:
+            project, error = next(saved)
+        if error is not None:
+            results.append({'filename': filename, 'status': 'error', 'error': error})
+            continue
+        info['pdfFile'] = f"/api/files/project/{filename}"
+        projects.append(info)
+        results.append({'filename': filename, 'status': 'ok', 'projectNumber': project.project_number})
+    return projects, results
 
 def update_project_from_info(info):
     """
@@ -85,4 +110,10 @@ def save_project_to_db(info, pdf_file_path):
     """
     单个项目保存，供controller直接调用
     """
-    return project_dao.save_project_to_db(info, pdf_file_path) 
\ No newline at end of file
+    return project_dao.save_project_to_db(info, pdf_file_path)
+
+def get_pdf_blob_info(sha256):
+    """
+    按摘要查项目PDF的大小和类型，供下载接口使用
+    """
+    return project_dao.get_pdf_blob_info(sha256)
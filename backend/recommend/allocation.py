@@ -0,0 +1,52 @@
+import numpy as np
+
+DEFAULT_GROUP_CAPACITY = 3  # 项目容量缺失或无法解析时的默认值，与 project/dao.py 一致
+
+
+def parse_capacity(value, default=DEFAULT_GROUP_CAPACITY):
+    """Project.group_capacity 是字符串列，解析为非负整数"""
+    try:
+        return max(int(value), 0)
+    except (ValueError, TypeError):
+        return default
+
+
+def allocate(scores, capacities):
+    """
+    带容量约束的全局最优分配：每个组最多分到一个项目，每个项目最多接收 capacity 个组，
+    使所有组的分数总和最大
+    把每个项目按容量展开成若干个相同的“名额”列，在 G×Σcapacity 的矩阵上求解指派问题（匈牙利算法）；
+    名额总数少于组数时，有的组分不到项目
+    Args:
+        scores: G×P 分数矩阵
+        capacities: 长度为 P 的项目容量
+    Returns:
+        长度为 G 的数组：每个组分到的项目列号，没分到时为 -1
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    scores = np.asarray(scores, dtype=np.float64)
+    group_count = scores.shape[0]
+    assignment = np.full(group_count, -1, dtype=np.int64)
+    # 一个项目的名额超过组数也用不上，展开的列数不超过 G×P
+    capacities = np.minimum(np.asarray(capacities, dtype=np.int64), group_count)
+    if group_count == 0 or capacities.sum() == 0:
+        return assignment
+
+    slot_projects = np.repeat(np.arange(len(capacities)), capacities)  # 名额列 -> 项目列号
+    rows, slots = linear_sum_assignment(scores[:, slot_projects], maximize=True)
+    assignment[rows] = slot_projects[slots]
+    return assignment
+
+
+def choice_ranks(scores, assignment):
+    """
+    分到的项目在各组自己推荐列表中的名次（从1开始，没分到时为 0）
+    与推荐排名的规则一致：分数从高到低，同分按项目顺序
+    """
+    ranks = np.zeros(len(assignment), dtype=np.int64)
+    for row in np.flatnonzero(assignment >= 0):
+        project = assignment[row]
+        score = scores[row, project]
+        ranks[row] = 1 + np.count_nonzero(scores[row] > score) + np.count_nonzero(scores[row, :project] == score)
+    return ranks
@@ -0,0 +1,257 @@
+"""
+推荐模块性能基准脚本
+
+用法（在 backend 目录下运行）:
+    python -m recommend.benchmark matcher [--repeat 5]
+    python -m recommend.benchmark memory [--groups 500 --group-size 5 --projects 200]
+    python -m recommend.benchmark allocation [--groups 3000 --projects 300 --max-capacity 5]
+    python -m recommend.benchmark parallel [--groups 4000 --projects 300 --workers 1,2,4]
+"""
+import argparse
+import os
+import re
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from recommend.service import analyze_skill_strength, skill_keywords, skill_taxonomy, level_keywords, RecommendSnapshot
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESUME_DIR = os.path.join(BACKEND_DIR, 'resume_uploads')
+PROJECT_DIR = os.path.join(BACKEND_DIR, 'staff_project')
+
+
+def legacy_keyword_pattern(keyword):
+    """
+    单个关键词的正则：前后不能紧接单词字符（c++、c# 这类以符号结尾的词也能匹配），
+    也不在 “单词.” 之后开始（vue.js 中的 js 不单独算）
+    """
+    return rf"(?<!\w)(?<!\w\.){re.escape(keyword)}(?!\w)"
+
+
+def legacy_analyze_skill_strength(text):
+    """
+    原逐词逐关键词 re.search 的实现（按词表的规范名和别名逐个匹配），作为黄金输出对照
+    词边界与 KeywordMatcher 相同（见 legacy_keyword_pattern），匹配器只改变扫描方式，不改变匹配结果
+    """
+    text_lower = text.lower() if text else ''
+    rating = defaultdict(int)
+    sentences = re.split(r"[。.\n]", text_lower)
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        current_level = 0
+        tokens = re.split(r"[;,]|\band\b", sentence)
+        for token in tokens:
+            token = token.strip()
+            for level, keywords in level_keywords.items():
+                for kw in keywords:
+                    if re.search(legacy_keyword_pattern(kw), token):
+                        current_level = level
+            for term, skill in skill_taxonomy.terms:
+                if re.search(legacy_keyword_pattern(term.lower()), token):
+                    level_to_use = current_level if current_level > 0 else 2
+                    rating[skill] = max(rating[skill], level_to_use)
+    return dict(rating)
+
+
+def load_sample_texts():
+    """读取 resume_uploads 和 staff_project 下的简历与项目文件文本"""
+    from utils.resume_utils import extract_text_from_pdf, extract_text_from_docx
+    from utils.project_utils import parse_project_pdf
+
+    texts = []
+    for directory in (RESUME_DIR, PROJECT_DIR):
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            ext = os.path.splitext(filename)[1].lower()
+            try:
+                if ext == '.pdf':
+                    texts.append(extract_text_from_pdf(path))
+                elif ext == '.docx':
+                    texts.append(extract_text_from_docx(path))
+                else:
+                    continue
+                if directory == PROJECT_DIR:
+                    texts.append(parse_project_pdf(path, filename)['requiredSkills'])
+            except Exception as e:
+                print(f"跳过无法解析的文件 {filename}: {e}")
+    return texts
+
+
+def _timeit(fn, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for t in texts:
+            fn(t)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_matcher(args):
+    texts = load_sample_texts()
+    print(f"样本文本: {len(texts)} 段，共 {sum(len(t) for t in texts)} 个字符")
+
+    mismatches = [i for i, t in enumerate(texts) if analyze_skill_strength(t) != legacy_analyze_skill_strength(t)]
+    if mismatches:
+        print(f"输出不一致的样本: {mismatches}")
+        return 1
+    print("黄金输出一致")
+
+    legacy = _timeit(legacy_analyze_skill_strength, texts, args.repeat)
+    current = _timeit(analyze_skill_strength, texts, args.repeat)
+    print(f"原实现: {legacy * 1000:.1f} ms")
+    print(f"编译匹配器: {current * 1000:.1f} ms")
+    print(f"加速比: {legacy / current:.1f}x")
+    return 0
+
+
+def random_vectors(rng, n, hits):
+    """n 个随机技能向量，每个命中 hits 个技能，等级 1~5"""
+    n_skills = len(skill_keywords)
+    vectors = np.zeros((n, n_skills), dtype=np.int64)
+    for row in vectors:
+        row[rng.choice(n_skills, hits, replace=False)] = rng.integers(1, 6, hits)
+    return vectors
+
+
+def random_groups(rng, n_groups, group_size):
+    return {
+        gid: (list(range(gid * group_size, (gid + 1) * group_size)), random_vectors(rng, group_size, 8))
+        for gid in range(n_groups)
+    }
+
+
+def bench_memory(args):
+    rng = np.random.default_rng(0)
+    n_skills = len(skill_keywords)
+    groups = random_groups(rng, args.groups, args.group_size)
+    projects = random_vectors(rng, args.projects, 6)
+
+    # 原表示：每组一个 int64 矩阵（字典持有）+ int64 项目矩阵
+    legacy = sum(skills.nbytes for _, skills in groups.values()) + projects.nbytes
+    snapshot = RecommendSnapshot(
+        *RecommendSnapshot.pack_groups(groups), RecommendSnapshot.pack_projects(projects),
+        [f"p{i}" for i in range(args.projects)], list(range(args.projects)), {}
+    )
+    member_bytes = snapshot.member_indptr.nbytes + snapshot.member_indices.nbytes + snapshot.member_data.nbytes
+    project_bytes = snapshot.project_indptr.nbytes + snapshot.project_indices.nbytes + snapshot.project_data.nbytes
+    derived_bytes = sum(a.nbytes for a in (snapshot.project_norms, snapshot.project_skill_counts,
+                                            snapshot.skill_project_index, snapshot.skill_project_offsets))
+    compact = member_bytes + project_bytes + derived_bytes
+    print(f"{args.groups} 个组 × {args.group_size} 人，{args.projects} 个项目，{n_skills} 个技能")
+    print(f"原表示（int64）: 成员 {sum(s.nbytes for _, s in groups.values()) / 1024:.1f} KB，项目 {projects.nbytes / 1024:.1f} KB")
+    print(f"CSR 表示: 成员 {member_bytes / 1024:.1f} KB（非零 {len(snapshot.member_data)} 个），"
+          f"项目 {project_bytes / 1024:.1f} KB（非零 {len(snapshot.project_data)} 个）"
+          f" + 行范数、技能数、倒排索引 {derived_bytes / 1024:.1f} KB")
+    print(f"压缩比: {legacy / compact:.1f}x")
+    return 0
+
+
+def bench_parallel(args):
+    from recommend.service import RecommendService
+    from recommend.parallel import rank_groups_parallel
+
+    rng = np.random.default_rng(0)
+    snapshot = RecommendSnapshot(
+        *RecommendSnapshot.pack_groups(random_groups(rng, args.groups, 5)),
+        RecommendSnapshot.pack_projects(random_vectors(rng, args.projects, 6)),
+        [f"p{i}" for i in range(args.projects)], list(range(args.projects)), {}
+    )
+    group_ids = list(snapshot.group_ids)
+    print(f"{args.groups} 个组，{args.projects} 个项目，CPU 核数 {os.cpu_count()}")
+
+    start = time.perf_counter()
+    expected = RecommendService._rank_groups(group_ids, 0.7, 0.3, snapshot)
+    serial = time.perf_counter() - start
+    print(f"单进程: {serial:.2f} s")
+    for workers in (int(w) for w in args.workers.split(',')):
+        # 第一次调用包含启动进程池、子进程加载快照，之后的重算复用进程池和已加载的快照
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            result = rank_groups_parallel(group_ids, 0.7, 0.3, snapshot, workers)
+            timings.append(time.perf_counter() - start)
+            if result != expected:
+                print(f"{workers} 个进程: 结果与单进程不一致")
+                return 1
+        cold, warm = timings
+        speedup = serial / warm
+        print(f"{workers} 个进程: 首次 {cold:.2f} s，复用进程池 {warm:.2f} s，"
+              f"加速比 {speedup:.2f}x，并行效率 {speedup / workers:.0%}")
+    return 0
+
+
+def greedy_top_groups(scores, capacities):
+    """原做法（project/dao.py get_all_projects）：每个项目各自取分数最高的前 capacity 个组，组之间不协调"""
+    picks = {}
+    for project, capacity in enumerate(capacities):
+        order = np.argsort(-scores[:, project], kind='stable')[:capacity]
+        for row in order:
+            picks.setdefault(row, []).append(project)
+    return picks
+
+
+def bench_allocation(args):
+    from recommend.allocation import allocate
+
+    rng = np.random.default_rng(0)
+    # 约三成的组与项目有共同技能，其余为0分
+    scores = rng.random((args.groups, args.projects)) * (rng.random((args.groups, args.projects)) < 0.3)
+    scores = np.round(scores, 4)
+    capacities = rng.integers(1, args.max_capacity + 1, args.projects)
+    print(f"{args.groups} 个组，{args.projects} 个项目，名额共 {capacities.sum()} 个")
+
+    start = time.perf_counter()
+    assignment = allocate(scores, capacities)
+    elapsed = time.perf_counter() - start
+    assigned = assignment >= 0
+    counts = np.bincount(assignment[assigned], minlength=args.projects)
+    assert (counts <= capacities).all()
+    total = scores[np.flatnonzero(assigned), assignment[assigned]].sum()
+    print(f"全局分配: {elapsed * 1000:.1f} ms，分到项目的组 {assigned.sum()}，总分 {total:.2f}")
+
+    picks = greedy_top_groups(scores, capacities)
+    multiple = sum(1 for projects in picks.values() if len(projects) > 1)
+    print(f"按项目各取前 N 组: 被多个项目选中的组 {multiple}，没被任何项目选中的组 {args.groups - len(picks)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推荐模块性能基准')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('matcher', help='技能匹配器：黄金输出校验 + 耗时对比')
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_matcher)
+
+    p = sub.add_parser('memory', help='技能矩阵内存占用：原 int64 表示与 CSR 表示对比')
+    p.add_argument('--groups', type=int, default=500)
+    p.add_argument('--group-size', type=int, default=5)
+    p.add_argument('--projects', type=int, default=200)
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser('parallel', help='多进程全量重算：各进程数下的耗时与加速比，并校验结果与单进程一致')
+    p.add_argument('--groups', type=int, default=4000)
+    p.add_argument('--projects', type=int, default=300)
+    p.add_argument('--workers', default='1,2,4', help='逗号分隔的进程数列表')
+    p.set_defaults(func=bench_parallel)
+
+    p = sub.add_parser('allocation', help='带容量约束的全局分配：求解耗时，与按项目各取前 N 组对比')
+    p.add_argument('--groups', type=int, default=3000)
+    p.add_argument('--projects', type=int, default=300)
+    p.add_argument('--max-capacity', type=int, default=5)
+    p.set_defaults(func=bench_allocation)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
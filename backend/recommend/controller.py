@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from utils.jwt_utils import verify_token
+from utils.request_utils import parse_fields, parse_page_args
 from models.project import Project
 from models.group import GroupMember
 from models.group_project_recommendation import GroupProjectRecommendation
@@ -32,6 +33,43 @@ def get_user_group_id(user_id):
     group_member = GroupMember.query.filter_by(user_id=user_id).first()
     return group_member.group_id if group_member else None
 
+# /student/recommend 可返回的字段 -> 需要查询的项目列（分数和排名来自推荐计算，不查表）
+RECOMMEND_FIELDS = {
+    'projectNumber': 'project_number',
+    'projectTitle': 'project_title',
+    'clientName': 'client_name',
+    'groupCapacity': 'group_capacity',
+    'projectRequirements': 'project_requirements',
+    'requiredSkills': 'required_skills',
+    'pdfFile': 'pdf_file',
+    'final_score': None,
+    'match_score': None,
+    'complementarity_score': None,
+    'rank': None,
+}
+
+def parse_weight_args():
+    """
+    解析权重参数 alpha / beta，只传一个时另一个取 1 减去它，都不传时使用默认权重
+    Returns:
+        (alpha, beta, error): 未传时为 None；参数不合法时 error 为错误信息
+    """
+    weights = {}
+    for name in ('alpha', 'beta'):
+        value = request.args.get(name)
+        if value in (None, ''):
+            continue
+        try:
+            weights[name] = float(value)
+        except ValueError:
+            return None, None, f'{name} 必须是数字'
+        if not 0 <= weights[name] <= 1:
+            return None, None, f'{name} 必须在 0 到 1 之间'
+    if len(weights) == 1:
+        (name, value), = weights.items()
+        weights['beta' if name == 'alpha' else 'alpha'] = round(1 - value, 10)
+    return weights.get('alpha'), weights.get('beta'), None
+
 @recommend_bp.route('/student/recommend', methods=['GET'])
 def get_recommendations():
     """
@@ -45,6 +83,31 @@ def get_recommendations():
         type: string
         required: true
         description: Bearer token
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: 每页返回的项目数，不传则返回全部
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: 上一页返回的 nextCursor，不传则从第一名开始
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: 逗号分隔的返回字段，如 projectNumber,projectTitle,final_score；不传返回全部字段
+      - name: alpha
+        in: query
+        type: number
+        required: false
+        description: 匹配度权重（0~1），默认 0.7；只传 alpha 时 beta = 1 - alpha
+      - name: beta
+        in: query
+        type: number
+        required: false
+        description: 互补度权重（0~1），默认 0.3；只传 beta 时 alpha = 1 - beta
     responses:
       200:
         description: 推荐成功
@@ -54,6 +117,13 @@ def get_recommendations():
             status:
               type: string
               example: "200"
+            total:
+              type: integer
+              example: 42
+            nextCursor:
+              type: string
+              example: "10"
+              description: 下一页的游标，没有下一页时为 null
             projects:
               type: array
               items:
@@ -115,57 +185,253 @@ def get_recommendations():
         if not payload:
             return jsonify({'status': '401', 'message': 'token无效'}), 401
         user_id = payload.get('user_id')
+        limit, offset, error = parse_page_args()
+        if error:
+            return jsonify({'status': '400', 'message': error}), 400
+        offset = offset or 0  # 游标为下一页起始的排名偏移量
+        fields, error = parse_fields(RECOMMEND_FIELDS)
+        if error:
+            return jsonify({'status': '400', 'message': error}), 400
+        if fields is None:
+            fields = set(RECOMMEND_FIELDS)
+        alpha, beta, error = parse_weight_args()
+        if error:
+            return jsonify({'status': '400', 'message': error}), 400
         # 2. 检查用户是否属于小组
         group_id = get_user_group_id(user_id)
         if not group_id:
             return jsonify({'status': '400', 'message': '用户不属于任何小组'}), 400
         
-        # 3. 推荐算法 - 只计算当前组的推荐
+        # 3. 推荐算法 - 只计算当前组的推荐，只对请求的这一页取前 k 名；
+        #    换权重时复用缓存的归一化分数，只重新加权和排名
         from recommend.service import RecommendService
-        RecommendService.load_data_from_db()
+        snapshot = RecommendService.load_data_from_db()
         
         # 只计算当前用户组的推荐，不计算所有组
-        user_recommendations = RecommendService._get_recommendations_for_group(
-            group_id, 
-            RecommendService._ALPHA, 
-            RecommendService._BETA
+        user_recommendations, total = RecommendService.get_top_recommendations(
+            group_id, limit, offset, alpha=alpha, beta=beta, snapshot=snapshot
         )
         
-        # 4. 可选：异步更新数据库（不阻塞响应）
-        # 这里先注释掉，避免每次请求都更新数据库
-        # RecommendService.update_recommendations_in_db({group_id: user_recommendations})
+        # 4. 推荐分数的持久化由后台预计算线程负责（recommend/worker.py），请求线程不写数据库
         
-        # 5. 批量获取项目信息
+        # 5. 批量获取项目信息（只取本页的项目，只查所选字段需要的列，不加载 PDF 等大字段）
         project_ids = [rec['project_id'] for rec in user_recommendations]
         projects_dict = {}
         if project_ids:
             from models.project import Project
-            projects_query = Project.query.filter(Project.id.in_(project_ids)).all()
+            columns = sorted({RECOMMEND_FIELDS[f] for f in fields if RECOMMEND_FIELDS[f]})
+            projects_query = db.session.query(
+                Project.id, *(getattr(Project, name) for name in columns)
+            ).filter(Project.id.in_(project_ids)).all()
             projects_dict = {p.id: p for p in projects_query}
         
         projects = []
+        scores = {
+            'final_score': lambda rec: str(rec['final_score']),
+            'match_score': lambda rec: str(rec['match_score']),
+            'complementarity_score': lambda rec: str(rec['complementarity_score']),
+            'rank': lambda rec: str(rec['rank']),
+        }
         # 返回推荐结果，按排名排序
         for rec in sorted(user_recommendations, key=lambda x: x['rank']):
             project = projects_dict.get(rec['project_id'])
             if project:
-                projects.append({
-                    'projectNumber': project.project_number,
-                    'final_score': str(rec['final_score']),
-                    'match_score': str(rec['match_score']),
-                    'complementarity_score': str(rec['complementarity_score']),
-                    'rank': str(rec['rank']),
-                    'projectTitle': project.project_title,
-                    'clientName': project.client_name,
-                    'groupCapacity': project.group_capacity,
-                    'projectRequirements': project.project_requirements,
-                    'requiredSkills': project.required_skills,
-                    'pdfFile': project.pdf_file
-                })
+                item = {}
+                for field in fields:
+                    column = RECOMMEND_FIELDS[field]
+                    item[field] = getattr(project, column) if column else scores[field](rec)
+                projects.append(item)
         
+        next_offset = offset + len(user_recommendations)
+        next_cursor = str(next_offset) if limit is not None and next_offset < total else None
         print(f"返回给用户 {user_id} (组 {group_id}) 的推荐项目数量: {len(projects)}")
-        return jsonify({'status': '200', 'projects': projects}), 200
+        return jsonify({'status': '200', 'projects': projects, 'total': total, 'nextCursor': next_cursor}), 200
     except Exception as e:
         import traceback
         print('推荐系统异常:', e, flush=True)
         print(traceback.format_exc(), flush=True)
         return jsonify({'status': '500', 'message': f'推荐系统出现错误: {str(e)}'}), 500
+
+@recommend_bp.route('/staff/allocation', methods=['GET'])
+def get_project_allocation():
+    """
+    按项目容量为所有组求全局最优的项目分配（每组一个项目，每个项目不超过 groupCapacity 个组，总分最大）
+    ---
+    tags:
+      - 推荐系统
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token
+      - name: alpha
+        in: query
+        type: number
+        required: false
+        description: 匹配度权重（0~1），默认 0.7；只传 alpha 时 beta = 1 - alpha
+      - name: beta
+        in: query
+        type: number
+        required: false
+        description: 互补度权重（0~1），默认 0.3；只传 beta 时 alpha = 1 - beta
+    responses:
+      200:
+        description: 分配成功
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: "200"
+            totalScore:
+              type: number
+              example: 35.1274
+            assignedCount:
+              type: integer
+              example: 48
+            firstChoiceCount:
+              type: integer
+              example: 31
+            allocations:
+              type: array
+              items:
+                type: object
+                properties:
+                  groupName:
+                    type: string
+                    example: "Team A"
+                  projectNumber:
+                    type: string
+                    example: "p1"
+                    description: 没分到项目时为 null
+                  projectTitle:
+                    type: string
+                    example: "AI-Enhanced Learning Platform"
+                  final_score:
+                    type: string
+                    example: "0.7956"
+                  rank:
+                    type: string
+                    example: "2"
+                    description: 该项目在本组推荐列表中的名次
+      400:
+        description: 参数错误
+      401:
+        description: 未授权或token无效
+      500:
+        description: 服务器错误
+    """
+    try:
+        token = get_token_from_header()
+        if not token:
+            return jsonify({'status': '401', 'message': '未授权'}), 401
+        payload = verify_token(token)
+        if not payload:
+            return jsonify({'status': '401', 'message': 'token无效'}), 401
+        alpha, beta, error = parse_weight_args()
+        if error:
+            return jsonify({'status': '400', 'message': error}), 400
+
+        from recommend.service import RecommendService
+        from recommend.allocation import parse_capacity
+        from models.group import Group
+        snapshot = RecommendService.load_data_from_db()
+
+        # 只取分配需要的列
+        projects = {
+            p.id: p for p in db.session.query(
+                Project.id, Project.project_number, Project.project_title, Project.group_capacity
+            ).all()
+        }
+        capacities = {pid: parse_capacity(p.group_capacity) for pid, p in projects.items()}
+        allocations = RecommendService.allocate_projects(capacities, alpha, beta, snapshot)
+        group_names = dict(db.session.query(Group.id, Group.group_name).all())
+
+        result = []
+        total_score = 0.0
+        for item in allocations:
+            project = projects.get(item['project_id'])
+            if project is not None:
+                total_score += item['final_score']
+            result.append({
+                'groupName': group_names.get(item['group_id']),
+                'projectNumber': project.project_number if project else None,
+                'projectTitle': project.project_title if project else None,
+                'final_score': str(item['final_score']) if project else None,
+                'rank': str(item['rank']) if project else None,
+            })
+        return jsonify({
+            'status': '200',
+            'totalScore': round(total_score, 4),
+            'assignedCount': sum(1 for item in allocations if item['project_id'] is not None),
+            'firstChoiceCount': sum(1 for item in allocations if item['rank'] == 1),
+            'allocations': result,
+        }), 200
+    except Exception as e:
+        print('项目分配异常:', e, flush=True)
+        print(traceback.format_exc(), flush=True)
+        return jsonify({'status': '500', 'message': f'项目分配出现错误: {str(e)}'}), 500
+
+@recommend_bp.route('/staff/recommend/cache-stats', methods=['GET'])
+def get_result_cache_stats():
+    """
+    查看推荐结果缓存的命中情况（排查推荐接口性能用；统计只针对处理本请求的 worker 进程）
+    ---
+    tags:
+      - 推荐系统
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token
+    responses:
+      200:
+        description: 获取成功
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: "200"
+            pid:
+              type: integer
+              example: 4211
+            cache:
+              type: object
+              properties:
+                size:
+                  type: integer
+                  example: 37
+                max_size:
+                  type: integer
+                  example: 1024
+                hits:
+                  type: integer
+                  example: 912
+                misses:
+                  type: integer
+                  example: 88
+                hit_rate:
+                  type: number
+                  example: 0.912
+                evictions:
+                  type: integer
+                  example: 0
+                invalidations:
+                  type: integer
+                  example: 3
+      401:
+        description: 未授权或token无效
+    """
+    token = get_token_from_header()
+    if not token:
+        return jsonify({'status': '401', 'message': '未授权'}), 401
+    payload = verify_token(token)
+    if not payload:
+        return jsonify({'status': '401', 'message': 'token无效'}), 401
+
+    import os
+    from recommend.service import RecommendService
+    return jsonify({'status': '200', 'pid': os.getpid(), 'cache': RecommendService.result_cache_stats()}), 200
@@ -0,0 +1,108 @@
+import atexit
+import multiprocessing
+import shutil
+import tempfile
+
+# 全量重算的进程池：第一次并行重算时创建，之后一直复用，进程数变化或子进程异常退出时重建
+_executor = None
+_executor_workers = 0
+# 本进程的临时快照目录：快照不是从共享快照目录加载的（增量更新后、未配置 RECOMMEND_SNAPSHOT_DIR）时，
+# 按快照序号写入这里一次，子进程再以 mmap 方式打开
+_scratch_store = None
+# 子进程中已加载的快照：(快照目录, RecommendSnapshot)，同一个目录只加载一次
+_loaded = None
+
+
+def _context():
+    """
+    子进程的启动方式：forkserver（不支持时用 spawn）
+    全量重算由推荐后台线程发起，不从多线程的 Web 服务进程直接 fork，避免子进程继承其他线程持有的锁
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _init_worker():
+    # 每个子进程只用一个 BLAS 线程，避免多进程 × 多线程超额占用 CPU
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def _get_executor(workers):
+    global _executor, _executor_workers
+    if _executor is not None and _executor_workers != workers:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if _executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=_context(), initializer=_init_worker)
+        _executor_workers = workers
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _snapshot_path(snapshot):
+    """子进程加载快照用的目录：mmap 加载的快照直接用其共享目录，否则按快照序号写入临时目录"""
+    global _scratch_store
+    if snapshot.path is not None:
+        return snapshot.path
+    from recommend.snapshot_store import SnapshotStore
+    if _scratch_store is None:
+        directory = tempfile.mkdtemp(prefix='recommend-snapshot-')
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        _scratch_store = SnapshotStore(directory)
+    return _scratch_store.save(snapshot, key=f"serial-{snapshot.serial}")
+
+
+def _rank_chunk(task):
+    global _loaded
+    from recommend.service import RecommendService
+    from recommend.snapshot_store import SnapshotStore
+
+    path, group_ids, alpha, beta = task
+    if _loaded is None or _loaded[0] != path:
+        _loaded = (path, SnapshotStore.load_path(path))
+    return RecommendService._rank_groups(group_ids, alpha, beta, _loaded[1])
+
+
+def rank_groups_parallel(group_ids, alpha, beta, snapshot, workers, chunk_size=None):
+    """
+    把组分块后在多个进程中计算并排名，按原顺序合并为 {group_id: 推荐列表}
+    结果与单进程的 RecommendService._rank_groups 逐位一致（分数已抹掉矩阵分块带来的末位浮点误差）
+    子进程按目录 mmap 打开快照文件，任务只传目录和组ID，快照不经过序列化
+    Args:
+        workers: 进程数
+        chunk_size: 每个任务的组数，默认每个进程分到约 4 块，兼顾负载均衡与任务开销
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    from recommend.service import RecommendService
+
+    group_ids = list(group_ids)
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(group_ids) // (workers * 4)))
+    chunks = [group_ids[i:i + chunk_size] for i in range(0, len(group_ids), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return RecommendService._rank_groups(group_ids, alpha, beta, snapshot)
+
+    path = _snapshot_path(snapshot)
+    tasks = [(path, chunk, alpha, beta) for chunk in chunks]
+    results = {}
+    try:
+        # map 按任务顺序返回，边算边合并
+        for part in _get_executor(workers).map(_rank_chunk, tasks):
+            results.update(part)
+    except BrokenProcessPool as e:
+        # 子进程异常退出，下次重算重建进程池，本次改为单进程计算
+        print(f"并行重算的进程池不可用，改为单进程计算: {e}")
+        _reset_executor()
+        return RecommendService._rank_groups(group_ids, alpha, beta, snapshot)
+    return results
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    推荐结果的 LRU 缓存，键为 (组ID, 权重...)，按快照序号区分
+    只保存当前快照的结果：快照序号变化时整体清空，旧快照算出的结果不会被读到。
+    增量更新可能发布数据版本号不变的新快照，所以不能用数据版本号区分，而用每个快照唯一、只增不减的序号
+    """
+
+    def __init__(self, max_size=1024):
+        """
+        Args:
+            max_size: 最多缓存的条目数，超出时淘汰最久未使用的条目；为 0 时不缓存
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._serial = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, serial, key):
+        """
+        读取缓存
+        Args:
+            serial: 计算所用快照的序号（RecommendSnapshot.serial）
+        Returns:
+            缓存的结果，未命中时返回 None
+        """
+        with self._lock:
+            if serial == self._serial and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, serial, key, value):
+        """写入缓存；快照序号与已缓存的不同时先清空旧快照的全部条目"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if serial != self._serial:
+                if self._serial is not None and serial < self._serial:
+                    # 持有旧快照的请求晚于新快照写入，结果直接丢弃
+                    return
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._serial = serial
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._serial = None
+
+    def stats(self):
+        """命中、未命中等计数"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
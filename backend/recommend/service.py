@@ -1,10 +1,16 @@
 import re
+import json
+import copy
+import math
+import itertools
+import hashlib
+import threading
 from collections import defaultdict
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import minmax_scale
 from models.project import Project
 from models.group import GroupMember
+from utils.skill_taxonomy import get_keyword_matcher, get_skill_taxonomy
+from recommend.result_cache import ResultCache
 
 # #设置远程 MySQL 数据库连接参数
 # import os
@@ -48,49 +54,9 @@ from models.group import GroupMember
 #     required_skills = db.Column(db.Text, nullable=False)
 #     pdf_file = db.Column(db.String(1024), nullable=True)
 
-skill_keywords = [
-    # 编程语言
-    "Python", "Java", "C++", "C#", "Go", "Rust", "Kotlin", "Swift",
-    "JavaScript", "TypeScript", "Ruby", "PHP", "R", "Shell", "Perl", "Golang",
-    # 前端开发
-    "Frontend", "HTML", "CSS", "React", "Vue.js", "Angular", "jQuery", "Bootstrap",
-    "Tailwind CSS", "Next.js", "SASS", "Webpack", "React Native", "Flutter",
-    # 后端开发 / 框架
-    "Backend", "Node.js", "Express.js", "Django", "Flask", "Spring Boot", "ASP.NET", "FastAPI",
-    "Koa", "NestJS", "Laravel", "Ruby on Rails", "Langchain", "LangGraph", "AutoGen",
-    # 数据库与数据分析
-    "Database", "SQL", "MySQL", "PostgreSQL", "MongoDB", "SQLite", "Redis", "Oracle",
-    "Pandas", "NumPy", "Matplotlib", "Seaborn", "Excel", "Power BI",
-    "Tableau", "ETL", "Data Warehousing", "BigQuery", "Firebase", "Data Structure", "Algorithm"
-    # 云计算与 DevOps
-    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Terraform",
-    "CI/CD", "Jenkins", "GitLab CI", "Ansible", "Prometheus", "Grafana",
-    "Linux", "Bash", "Nginx", "Apache", "Vercel", "Render",
-    # 安全与测试
-    "Penetration Testing", "OWASP", "Burp Suite", "Wireshark", "Data Security", "Authentication",
-    "Unit Testing", "Integration Testing", "Selenium", "Jest", "Cypress",
-    "Postman", "Test Automation", "Heuristic Evaluation", "A/B Testing", "Cryptography", "Blockchain"
-    # 工具与版本控制
-    "Git", "GitHub", "GitLab", "Bitbucket", "JIRA", "VS Code",
-    "IntelliJ IDEA", "Eclipse", "Figma", "Notion", "Slack", "Wireframe",
-    # ERP / 商业系统
-    "ERP", "SAP", "Oracle ERP", "Odoo", "Salesforce", "CRM", "PowerApps", "SharePoint", "Zoho"
-    # 可视化与 UI/UX
-    "D3.js", "Chart.js", "Figma", "UX", "UI", "Design Critique",
-    "Information Hierarchy", "Declarative UI", "Human–Computer Interaction", 'Software Development'
-    # 身份验证与 API
-    "JWT", "Firebase Auth", "PayTo API",
-    # 游戏/VR开发
-    "Unity", "Unity3D", "OpenXR", "Oculus SDK", "SteamVR",
-    "Graphics Programming", "Shader", "Rendering Pipeline",
-    # LLM / AI / 智能代理
-    "LLMs", "Agent Framework", "Feedback Loop Design", "Behavioral Nudges",
-    "Natural Language Processing", "AI", "Machine Learning", "Temporal Modeling",
-    # 教育与内容设计
-    "Curriculum Design", "Storytelling", "Narrative Structure", "Learning Design", "AQF", "TEQSA",
-    # 协作与敏捷开发
-    "Agile", "Sprint-based Environment", "Team Collaboration", "Peer Review", "Design Critique"
-]
+# 技能词表：规范技能名按 id 排列，即技能向量的各列（词表、别名见 utils/skill_taxonomy.json）
+skill_taxonomy = get_skill_taxonomy()
+skill_keywords = skill_taxonomy.names
 
 # 按强度分级的关键词
 level_keywords = {
@@ -101,14 +67,26 @@ level_keywords = {
     1: ["understanding", "know", "aware of"]
 }
 
+# 断句与分词规则（与原实现保持一致）
+_SENTENCE_SPLIT = re.compile(r"[。.\n]")
+_TOKEN_SPLIT = re.compile(r"[;,]|\band\b")
+
+# 强度关键词 -> 等级；原实现按字典顺序逐个覆盖，同一分词命中多个时以顺序靠后的为准
+_LEVEL_ORDER = {}
+for _level, _keywords in level_keywords.items():
+    for _kw in _keywords:
+        _LEVEL_ORDER[_kw] = (len(_LEVEL_ORDER), _level)
+
+
 def analyze_skill_strength(text):
     text_lower = text.lower() if text else ''
     rating = defaultdict(int)
+    # 别名命中时归并到规范技能名
+    skill_matcher = get_keyword_matcher(skill_taxonomy.terms)
+    level_matcher = get_keyword_matcher(tuple(_LEVEL_ORDER))
 
     # 以句号、换行断句
-    sentences = re.split(r"[。.\n]", text_lower)
-
-    for sentence in sentences:
+    for sentence in _SENTENCE_SPLIT.split(text_lower):
         sentence = sentence.strip()
         if not sentence:
             continue
@@ -117,25 +95,54 @@ def analyze_skill_strength(text):
         current_level = 0
 
         # 按词语拆分，但尽量保留语义（避免中文拆分过碎）
-        tokens = re.split(r"[;,]|\band\b", sentence)
-
-        for token in tokens:
+        for token in _TOKEN_SPLIT.split(sentence):
             token = token.strip()
             # 如果有强度关键词，更新当前强度
-            for level, keywords in level_keywords.items():
-                for kw in keywords:
-                    if re.search(rf"\b{re.escape(kw)}\b", token):
-                        current_level = level
-
-            # 遍历技能关键词，赋值
-            for skill in skill_keywords:
-                pattern = rf"\b{re.escape(skill.lower())}\b"
-                if re.search(pattern, token):
-                    level_to_use = current_level if current_level > 0 else 2
-                    rating[skill] = max(rating[skill], level_to_use)
+            levels = level_matcher.find(token)
+            if levels:
+                current_level = max(_LEVEL_ORDER[kw] for kw in levels)[1]
+
+            # 技能关键词一次扫描全部找出，赋值
+            level_to_use = current_level if current_level > 0 else 2
+            for skill in skill_matcher.find(token):
+                rating[skill] = max(rating[skill], level_to_use)
 
     return dict(rating)
 
+
+# ========== 持久化技能向量 ==========
+# 向量版本：技能词表版本或强度规则变化时随之变化，库里存的向量版本不一致时需重新分析文本
+SKILL_VECTOR_VERSION = hashlib.sha1(
+    json.dumps([skill_taxonomy.version, level_keywords], ensure_ascii=False).encode('utf-8')
+).hexdigest()[:16]
+
+
+def skill_dict_to_vector(skill_dict):
+    """技能强度字典 -> 按技能词表展开的向量"""
+    return np.array([skill_dict.get(skill, 0) for skill in skill_keywords], dtype=np.uint8)
+
+
+def count_skills(vector):
+    """向量中命中的技能个数，与 len(analyze_skill_strength(text)) 一致"""
+    return int(np.count_nonzero(vector))
+
+
+def compute_skill_vector(text):
+    """
+    分析技能文本并编码，供写入简历、组员、项目时一并保存
+    Returns:
+        (bytes, str): uint8 紧凑向量、词表版本
+    """
+    vector = skill_dict_to_vector(analyze_skill_strength(text or ""))
+    return vector.astype(np.uint8).tobytes(), SKILL_VECTOR_VERSION
+
+
+def decode_skill_vector(blob, version):
+    """解码库里保存的技能向量；缺失或版本不一致时返回 None，由调用方重新分析文本"""
+    if blob is None or version != SKILL_VECTOR_VERSION or len(blob) != len(skill_keywords):
+        return None
+    return np.frombuffer(blob, dtype=np.uint8)
+
 # ========== 主程序入口 ==========
 # print("开始连接数据库...")
 # try:
@@ -187,291 +194,1093 @@ def analyze_skill_strength(text):
 #     import traceback
 #     traceback.print_exc()
 
+# 快照序号：本进程内每个快照（含增量更新生成的）唯一、只增不减，结果缓存按它区分快照
+_snapshot_serials = itertools.count(1)
+
+
+def _sparse_row(vector):
+    """稠密技能向量 -> (非零列号, 非零等级)，供拼装 CSR 数组"""
+    vector = np.asarray(vector)
+    columns = np.flatnonzero(vector)
+    return columns, vector[columns]
+
+
+def _row_positions(indptr, rows):
+    """
+    CSR 中选定行的非零元素位置
+    Returns:
+        (lengths, positions): 每行的非零个数、这些行的非零元素在 indices / data 中的下标（按行拼接）
+    """
+    if rows is None:
+        return np.diff(indptr), np.arange(indptr[-1])
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    return lengths, np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+
+class RecommendSnapshot:
+    """
+    推荐数据快照，创建后不再修改
+    完整加载和增量更新都生成新的快照，再整体替换 RecommendService._snapshot；
+    一次推荐计算只引用同一个快照，不会读到新旧混杂的数据
+
+    成员技能、项目技能都以 CSR 形式存放（indptr / indices / data 三个数组），内存与非零元素个数成正比：
+    第 r 行的非零列号是 indices[indptr[r]:indptr[r + 1]]，等级是 data 的同一段。
+    成员按组连续存放，第 i 个组的成员是第 group_offsets[i] 到 group_offsets[i + 1] 行；
+    稠密矩阵只在计算时按所选的行临时展开（dense_members / dense_projects），快照本身不持有
+    """
+
+    # 由项目 CSR 数组派生的数组（行范数、技能数、倒排索引），随共享快照文件一起保存
+    PROJECT_DERIVED = ('project_norms', 'project_skill_counts', 'skill_project_index', 'skill_project_offsets')
+
+    def __init__(self, members, member_ids, group_ids, group_offsets,
+                 projects, project_names, project_ids, data_version, project_derived=None):
+        """
+        Args:
+            members: 成员技能的 CSR 数组 (indptr, indices, data)，由 pack_groups 生成
+            projects: 项目技能的 CSR 数组 (indptr, indices, data)，由 pack_projects 生成
+            project_derived: {PROJECT_DERIVED 中的名称: 数组}，共享快照 mmap 加载时传入，为 None 时重新计算
+        """
+        self._set_members(members, member_ids, group_ids, group_offsets)
+        self._set_projects(projects, project_names, project_ids, project_derived)
+        self.data_version = data_version  # 快照对应的数据版本号
+        self.serial = next(_snapshot_serials)  # 快照序号，增量更新后数据版本号可能不变，序号一定变化
+        self.path = None  # 从 SnapshotStore mmap 加载时为快照目录，内容与该目录一致
+        self.decoded_count = 0   # 加载时直接解码的向量数
+        self.analyzed_count = 0  # 加载时重新分析文本的向量数
+
+    def _set_members(self, members, member_ids, group_ids, group_offsets):
+        # 共享快照中的 mmap 数组类型已一致，不会复制
+        indptr, indices, data = members
+        self.member_indptr = np.asarray(indptr, dtype=np.int64)    # 长度 M+1
+        self.member_indices = np.asarray(indices, dtype=np.int32)  # 非零技能列号
+        self.member_data = np.asarray(data, dtype=np.uint8)        # 非零技能等级
+        self.member_ids = list(member_ids)  # 与成员行一一对应
+        self.group_ids = list(group_ids)
+        self.group_offsets = np.asarray(group_offsets, dtype=np.int64)  # 长度 G+1
+        self.group_rows = {group_id: i for i, group_id in enumerate(self.group_ids)}  # {group_id: 分段序号}
+        self._sparse_members = None
+        self.member_groups = {}  # {user_id: group_id}
+        for i, group_id in enumerate(self.group_ids):
+            for user_id in self.member_ids[self.group_offsets[i]:self.group_offsets[i + 1]]:
+                self.member_groups[user_id] = group_id
+        for array in (self.member_indptr, self.member_indices, self.member_data):
+            array.flags.writeable = False
+
+    def _set_projects(self, projects, project_names, project_ids, derived=None):
+        indptr, indices, data = projects
+        self.project_indptr = np.asarray(indptr, dtype=np.int64)    # 长度 P+1
+        self.project_indices = np.asarray(indices, dtype=np.int32)  # 非零技能列号（即项目需求掩码）
+        self.project_data = np.asarray(data, dtype=np.float32)      # 非零技能等级
+        self.project_names = list(project_names)
+        self.project_ids = list(project_ids)
+        self._sparse_projects = None
+        if derived is None:
+            derived = self._derive_projects()
+        # 共享快照中的派生数组直接引用 mmap，各进程不再各自计算一份
+        self.project_norms = np.asarray(derived['project_norms'], dtype=np.float64)
+        self.project_skill_counts = np.asarray(derived['project_skill_counts'], dtype=np.float64)
+        self.skill_project_index = np.asarray(derived['skill_project_index'], dtype=np.int64)
+        self.skill_project_offsets = np.asarray(derived['skill_project_offsets'], dtype=np.int64)
+        for array in (self.project_indptr, self.project_indices, self.project_data, self.project_norms,
+                      self.project_skill_counts, self.skill_project_index, self.skill_project_offsets):
+            array.flags.writeable = False
+
+    def _derive_projects(self):
+        """由项目 CSR 数组计算 PROJECT_DERIVED 中的各数组"""
+        project_rows = np.repeat(np.arange(len(self.project_ids)), np.diff(self.project_indptr))
+        # 行范数用于余弦相似度；技能等级都是小整数，平方和按 float64 累加无误差
+        squares = self.project_data.astype(np.float64) ** 2
+        # 倒排索引：技能 s 对应的项目列号为 skill_project_index[skill_project_offsets[s]:skill_project_offsets[s + 1]]
+        order = np.argsort(self.project_indices, kind='stable')  # 同一技能内项目行号保持升序
+        return {
+            'project_norms': np.sqrt(np.bincount(project_rows, weights=squares, minlength=len(self.project_ids))),
+            'project_skill_counts': np.diff(self.project_indptr).astype(np.float64),  # 每个项目需要的技能数
+            'skill_project_index': project_rows[order].astype(np.int64),
+            'skill_project_offsets': np.concatenate(
+                [[0], np.cumsum(np.bincount(self.project_indices, minlength=len(skill_keywords)))]
+            ).astype(np.int64),
+        }
+
+    @staticmethod
+    def _pack_rows(rows, dtype):
+        """行列表（稠密向量或 (列号, 等级)）-> CSR 数组 (indptr, indices, data)，只保留非零元素"""
+        rows = [row if isinstance(row, tuple) else _sparse_row(row) for row in rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(columns) for columns, _ in rows], out=indptr[1:])
+        if not rows:
+            return indptr, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=dtype)
+        indices = np.concatenate([columns for columns, _ in rows]).astype(np.int32)
+        data = np.concatenate([values for _, values in rows]).astype(dtype)
+        return indptr, indices, data
+
+    @classmethod
+    def pack_groups(cls, groups):
+        """
+        {group_id: (user_id 列表, 成员技能行)} -> (members, member_ids, group_ids, group_offsets)
+        成员技能行可以是稠密矩阵，也可以是 (列号, 等级) 列表（groups() 的返回值）
+        """
+        group_ids = list(groups.keys())
+        member_ids = []
+        offsets = [0]
+        rows = []
+        for group_id in group_ids:
+            ids, skills = groups[group_id]
+            member_ids.extend(ids)
+            offsets.append(offsets[-1] + len(ids))
+            rows.extend(skills)
+        return cls._pack_rows(rows, np.uint8), member_ids, group_ids, offsets
+
+    @classmethod
+    def pack_projects(cls, rows):
+        """项目技能行（稠密向量或 (列号, 等级)）-> 项目 CSR 数组"""
+        return cls._pack_rows(rows, np.float32)
+
+    @staticmethod
+    def _dense_rows(csr, rows, dtype):
+        """CSR 中选定的行展开成稠密矩阵（rows 为 None 时展开全部行）"""
+        indptr, indices, data = csr
+        lengths, positions = _row_positions(indptr, rows)
+        dense = np.zeros((len(lengths), len(skill_keywords)), dtype=dtype)
+        dense[np.repeat(np.arange(len(lengths)), lengths), indices[positions]] = data[positions]
+        return dense
+
+    def dense_members(self, rows=None):
+        """选定成员行的稠密 uint8 技能矩阵（临时构造，不缓存）"""
+        return self._dense_rows((self.member_indptr, self.member_indices, self.member_data), rows, np.uint8)
+
+    def dense_projects(self, rows=None):
+        """选定项目行的稠密 float32 技能矩阵（临时构造，不缓存）"""
+        return self._dense_rows((self.project_indptr, self.project_indices, self.project_data), rows, np.float32)
+
+    def member_skill_ids(self, rows=None):
+        """选定成员掌握的技能列号（去重、升序）"""
+        _, positions = _row_positions(self.member_indptr, rows)
+        return np.unique(self.member_indices[positions])
+
+    def _member_row(self, row):
+        start, stop = self.member_indptr[row], self.member_indptr[row + 1]
+        return self.member_indices[start:stop], self.member_data[start:stop]
+
+    def groups(self):
+        """按顺序返回 {group_id: (user_id 列表, [(列号, 等级), ...])}，供增量更新修改后重新打包"""
+        return {
+            group_id: (
+                self.member_ids[self.group_offsets[i]:self.group_offsets[i + 1]],
+                [self._member_row(row) for row in range(self.group_offsets[i], self.group_offsets[i + 1])]
+            )
+            for i, group_id in enumerate(self.group_ids)
+        }
+
+    def project_rows(self):
+        """按顺序返回每个项目的 (列号, 等级)，供增量更新修改后重新打包"""
+        return [
+            (self.project_indices[start:stop], self.project_data[start:stop])
+            for start, stop in zip(self.project_indptr[:-1], self.project_indptr[1:])
+        ]
+
+    def projects_with_skills(self, skill_ids):
+        """通过倒排索引找出需要其中任一技能的项目列号（升序）"""
+        segments = [
+            self.skill_project_index[self.skill_project_offsets[s]:self.skill_project_offsets[s + 1]]
+            for s in skill_ids
+        ]
+        if not segments:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(segments))
+
+    def sparse_members(self):
+        """成员矩阵的 scipy.sparse CSR 形式（直接引用快照的 CSR 数组，同一快照只构造一次）"""
+        if self._sparse_members is None:
+            from scipy import sparse
+            self._sparse_members = sparse.csr_matrix(
+                (self.member_data.astype(np.float64), self.member_indices, self.member_indptr),
+                shape=(len(self.member_ids), len(skill_keywords))
+            )
+        return self._sparse_members
+
+    def sparse_projects(self):
+        """项目矩阵与需求掩码的 CSR 形式（掩码与项目矩阵结构相同，非零值为1）"""
+        if self._sparse_projects is None:
+            from scipy import sparse
+            shape = (len(self.project_ids), len(skill_keywords))
+            self._sparse_projects = (
+                sparse.csr_matrix((self.project_data.astype(np.float64), self.project_indices, self.project_indptr),
+                                  shape=shape),
+                sparse.csr_matrix((np.ones(len(self.project_data)), self.project_indices, self.project_indptr),
+                                  shape=shape),
+            )
+        return self._sparse_projects
+
+    def with_members(self, groups, data_version):
+        """返回替换了组成员数据的新快照，项目数据与原快照共享"""
+        snapshot = copy.copy(self)
+        snapshot._set_members(*self.pack_groups(groups))
+        snapshot.data_version = data_version
+        snapshot.serial = next(_snapshot_serials)
+        snapshot.path = None
+        return snapshot
+
+    def with_projects(self, project_rows, project_names, project_ids, data_version):
+        """返回替换了项目数据的新快照，组成员数据与原快照共享"""
+        snapshot = copy.copy(self)
+        snapshot._set_projects(self.pack_projects(project_rows), project_names, project_ids)
+        snapshot.data_version = data_version
+        snapshot.serial = next(_snapshot_serials)
+        snapshot.path = None
+        return snapshot
+
+
 class RecommendService:
     """推荐系统服务类"""
-    _group_skills = None
-    _project_skills = None
-    _project_names = None
-    _project_ids = None
+    _snapshot = None  # 当前数据快照（RecommendSnapshot），只整体替换、不原地修改
+    _write_lock = threading.Lock()  # 加载与增量更新串行执行，读取不加锁
+    _snapshot_store = None  # 多进程共享的快照文件存储（SnapshotStore），未配置时各进程独立加载
+    _matrix_backend = 'dense'  # 评分矩阵后端：'dense'（numpy）或 'sparse'（scipy.sparse CSR）
     _ALPHA = 0.7  # 匹配度权重
     _BETA = 0.3   # 项目相关互补度权重
-    _last_load_time = None  # 缓存时间戳
-    _cache_duration = 1800  # 缓存30分钟（原来是300秒=5分钟）
+    _LOAD_BATCH_SIZE = 1000  # 加载时每批流式读取的行数
+    _result_cache = ResultCache()  # 单组分数的 LRU 缓存，快照替换后失效
+    _recompute_workers = 1  # 全量重算的进程数，大于1时分块并行（recommend/parallel.py）
 
     @classmethod
     def load_data_from_db(cls):
         """
-        从数据库加载成员技能和项目技能数据，构造向量
+        返回当前数据快照，组成员或项目的数据版本号变化时重新加载
+        同一时刻只有一个线程加载：已有旧快照时其他线程直接使用旧快照，
+        首次加载时其他线程等待加载完成
+        Returns:
+            RecommendSnapshot
         """
-        import time
-        
-        # 检查缓存是否有效
-        current_time = time.time()
-        if (cls._last_load_time and 
-            cls._group_skills is not None and 
-            cls._project_skills is not None and
-            current_time - cls._last_load_time < cls._cache_duration):
-            return
-        
+        from utils.data_version_utils import get_data_versions
+
+        # 检查缓存是否有效（先读版本号再读数据，期间若有写入，下次调用会再次加载）
+        data_version = get_data_versions()
+        snapshot = cls._snapshot
+        if snapshot is not None and snapshot.data_version == data_version:
+            return snapshot
+
+        if not cls._write_lock.acquire(blocking=snapshot is None):
+            # 其他线程正在加载或更新，先使用旧快照
+            return snapshot
+        try:
+            if cls._snapshot is not snapshot:
+                # 等待期间其他线程已发布了新快照
+                return cls._snapshot
+            cls._snapshot = cls._load_or_build_snapshot(data_version)
+            return cls._snapshot
+        finally:
+            cls._write_lock.release()
+
+    @classmethod
+    def configure_snapshot_store(cls, directory):
+        """配置共享快照目录（应用启动时调用）；目录为空或平台不支持文件锁时不启用"""
+        from recommend.snapshot_store import SnapshotStore
+        if directory and SnapshotStore.available():
+            cls._snapshot_store = SnapshotStore(directory)
+        else:
+            cls._snapshot_store = None
+
+    @classmethod
+    def configure_matrix_backend(cls, backend):
+        """
+        选择评分矩阵后端（应用启动时调用）
+        技能词表很大、每个成员只命中少数技能时用 'sparse'，内存和计算量与非零元素个数成正比
+        """
+        if backend not in ('dense', 'sparse'):
+            print(f"未知的矩阵后端 {backend}，改用 dense")
+            backend = 'dense'
+        cls._matrix_backend = backend
+
+    @classmethod
+    def configure_result_cache(cls, max_size):
+        """设置单组推荐结果缓存的容量（应用启动时调用），为 0 时不缓存"""
+        cls._result_cache = ResultCache(max_size)
+
+    @classmethod
+    def configure_recompute_workers(cls, workers):
+        """设置全量重算的默认进程数（应用启动时调用）"""
+        cls._recompute_workers = max(int(workers), 1)
+
+    @classmethod
+    def result_cache_stats(cls):
+        """推荐结果缓存的命中、未命中、淘汰计数"""
+        return cls._result_cache.stats()
+
+    @classmethod
+    def _load_or_build_snapshot(cls, data_version):
+        """
+        优先 mmap 加载其他进程已发布的同版本共享快照；
+        没有时在跨进程文件锁内从数据库重建并发布，只有一个进程承担重建开销
+        """
+        store = cls._snapshot_store
+        if store is None:
+            return cls._build_snapshot(data_version)
+        try:
+            snapshot = store.load(data_version)
+            if snapshot is not None:
+                print(f"加载共享推荐快照: {store.version_key(data_version)}")
+                return snapshot
+            with store.lock():
+                # 等锁期间其他进程可能已经发布
+                snapshot = store.load(data_version)
+                if snapshot is None:
+                    snapshot = cls._build_snapshot(data_version)
+                    store.save(snapshot)
+                    # 重新以 mmap 方式加载，本进程也与其他进程共用同一份数据
+                    snapshot = store.load(data_version) or snapshot
+            return snapshot
+        except (OSError, ValueError) as e:
+            print(f"共享推荐快照不可用，改为直接加载: {e}")
+            return cls._build_snapshot(data_version)
+
+    @classmethod
+    def _build_snapshot(cls, data_version):
+        """从数据库加载成员技能和项目技能数据，构造向量快照"""
+        from models.user import db
+
         print("\n" + "="*80)
         print("开始加载数据库数据...")
         
         # 技能词表用于构建统一维度的向量
         all_skills = skill_keywords
         print(f"技能词表维度: {len(all_skills)}")
+        stats = {'decoded': 0, 'analyzed': 0}
 
-        # 查询所有组成员，按group_id分组
-        group_members = GroupMember.query.all()
-        print(f"查询到 {len(group_members)} 个组成员")
+        # 查询所有组成员（只取需要的列，流式读取），按group_id分组
+        group_members = db.session.query(
+            GroupMember.group_id, GroupMember.user_id, GroupMember.skill,
+            GroupMember.skill_vector, GroupMember.skill_vector_version
+        ).yield_per(cls._LOAD_BATCH_SIZE)
         
         group_data = {}
+        member_count = 0
         for member in group_members:
-            if member.group_id not in group_data:
-                group_data[member.group_id] = []
-            
-            # 分析组员技能
-            skill_dict = analyze_skill_strength(member.skill or "")
-            vector = [skill_dict.get(skill, 0) for skill in all_skills]
-            
-            # 减少调试输出，只显示关键信息
-            if len(skill_dict) > 0:
-                pass # 删除所有print相关的调试输出
-            
-            group_data[member.group_id].append(vector)
+            # 优先使用保存的技能向量，缺失时才分析组员技能文本
+            vector = cls._resolve_vector(member.skill, member.skill_vector, member.skill_vector_version, stats)
+            user_ids, rows = group_data.setdefault(member.group_id, ([], []))
+            user_ids.append(member.user_id)
+            rows.append(_sparse_row(vector))  # 只保留非零技能
+            member_count += 1
+        print(f"查询到 {member_count} 个组成员")
         
         print(f"按组ID分组后，共有 {len(group_data)} 个不同的组")
         
-        # 为每个组计算平均技能向量
-        cls._group_skills = {}
-        for group_id, vectors in group_data.items():
-            if vectors:  # 确保组内有成员
-                group_skills_array = np.array(vectors)
-                cls._group_skills[group_id] = group_skills_array
-                
-                # 计算组平均技能向量
-                avg_vector = np.mean(group_skills_array, axis=0)
-                non_zero_skills = [(skill, avg_vector[i]) for i, skill in enumerate(all_skills) if avg_vector[i] > 0]
-                
-                pass # 删除所有print相关的调试输出
-        
-        print(f"成功加载 {len(cls._group_skills)} 个组的技能数据")
+        # 所有组的成员技能按组连续存放在一组 CSR 数组中
+        members = RecommendSnapshot.pack_groups(group_data)
+        print(f"成功加载 {len(group_data)} 个组的技能数据")
 
-        # 查询项目
-        projects = Project.query.all()
-        print(f"查询到 {len(projects)} 个项目")
+        # 查询项目（只取需要的列，不加载 PDF 等大字段）
+        projects = db.session.query(
+            Project.id, Project.project_title, Project.required_skills,
+            Project.skill_vector, Project.skill_vector_version
+        ).yield_per(cls._LOAD_BATCH_SIZE)
         
-        project_vectors = []
+        project_rows = []
         project_names = []
         project_ids = []
         skipped_count = 0
         for project in projects:
-            skill_dict = analyze_skill_strength(project.required_skills or "")
+            vector = cls._resolve_vector(project.required_skills, project.skill_vector, project.skill_vector_version, stats)
             
-            if len(skill_dict) < 3:
+            if count_skills(vector) < 3:
                 skipped_count += 1
                 continue  # 忽略技能太少的项目
             
-            vector = [skill_dict.get(skill, 0) for skill in all_skills]
-            project_vectors.append(vector)
+            project_rows.append(_sparse_row(vector))
             project_names.append(project.project_title)
             project_ids.append(project.id)
         
-        print(f"有效项目: {len(project_vectors)} 个，跳过技能不足项目: {skipped_count} 个")
+        print(f"查询到 {len(project_rows) + skipped_count} 个项目")
+        print(f"有效项目: {len(project_rows)} 个，跳过技能不足项目: {skipped_count} 个")
+        print(f"技能向量: 直接解码 {stats['decoded']} 条，重新分析文本 {stats['analyzed']} 条")
         
-        if len(project_vectors) == 0:
+        if len(project_rows) == 0:
             print("警告: 没有有效的项目数据！")
-            cls._project_skills = np.array([])
-            cls._project_names = []
-            cls._project_ids = []
-        else:
-            cls._project_skills = np.array(project_vectors)
-            cls._project_names = project_names
-            cls._project_ids = project_ids
-            print(f"项目数据加载完成，维度: {cls._project_skills.shape}")
-        
-        # 更新缓存时间戳
-        cls._last_load_time = current_time
+        snapshot = RecommendSnapshot(
+            *members, RecommendSnapshot.pack_projects(project_rows), project_names, project_ids, data_version
+        )
+        snapshot.decoded_count = stats['decoded']
+        snapshot.analyzed_count = stats['analyzed']
+        if project_rows:
+            print(f"项目数据加载完成，维度: ({len(project_ids)}, {len(all_skills)})，非零元素 {len(snapshot.project_data)} 个")
         print("="*80)
+        return snapshot
+
+    @classmethod
+    def _resolve_vector(cls, text, blob=None, version=None, stats=None):
+        """取技能向量：优先解码保存的向量，缺失或版本过期时分析文本"""
+        vector = decode_skill_vector(blob, version)
+        if vector is not None:
+            if stats is not None:
+                stats['decoded'] += 1
+            return vector
+        if stats is not None:
+            stats['analyzed'] += 1
+        return skill_dict_to_vector(analyze_skill_strength(text or ""))
+
+    # ==================== 增量更新 ====================
+    # 写入路径提交后调用，只修补受影响的行，不重建整个模型。
+    # written_version 为该写入 bump_data_version 得到的版本号，用来判断快照能否推进到这个版本。
+    # 在写锁内基于当前快照生成新快照后整体替换；快照尚未加载时直接跳过，下次请求会完整加载。
 
     @classmethod
-    def compute_group_vector(cls, group_skills):
-        """计算小组技能向量平均值"""
-        return np.mean(group_skills, axis=0)
+    def _advanced_data_version(cls, snapshot, scope, written_version):
+        """
+        增量更新后的快照版本号
+        Args:
+            written_version: 本次写入时 bump_data_version 返回的新版本号
+        只有本次写入恰好是快照之后的下一次写入时才推进到该版本；中间还有其他写入（例如别的进程）
+        或版本号未知时保持旧版本号，让下次请求完整重载
+        """
+        if written_version is not None and written_version == snapshot.data_version.get(scope, 0) + 1:
+            return {**snapshot.data_version, scope: written_version}
+        return snapshot.data_version
+
+    @classmethod
+    def _drop_member_row(cls, groups, group_id, user_id):
+        """从组员原所在组的技能行中移除该组员（修改 snapshot.groups() 返回的新字典，不动原快照）"""
+        member_ids, rows = groups[group_id]
+        row = member_ids.index(user_id)
+        if len(member_ids) > 1:
+            groups[group_id] = (member_ids[:row] + member_ids[row + 1:], rows[:row] + rows[row + 1:])
+        else:
+            del groups[group_id]
 
     @classmethod
-    def compute_match_scores(cls, group_vector, project_skills):
-        """计算匹配度分数（不归一化）"""
-        from sklearn.metrics.pairwise import cosine_similarity
-        return cosine_similarity([group_vector], project_skills).flatten()
+    def upsert_member(cls, user_id, written_version=None):
+        """组员技能或所属组变化（简历上传）后，只重新分析这一位组员"""
+        cls.upsert_members([user_id], written_version)
 
     @classmethod
-    def compute_project_aware_complementarity(cls, group_skills, project_vector):
+    def upsert_members(cls, user_ids, written_version=None):
         """
-        计算某个项目需求下，小组成员技能维度的分工程度（标准差越大表示越互补）
+        一次写入涉及多位组员（建组）时，一次查询、修补全部成员行后只发布一个快照，
+        不会发布只修补了一部分组员、却已推进到本次写入版本号的中间快照
         """
-        relevant_dims = np.where(project_vector > 0)[0]
-        if len(relevant_dims) == 0:
-            return 0.0
-        scores = []
-        for dim in relevant_dims:
-            values = group_skills[:, dim]
-            std_dev = np.std(values)
-            scores.append(std_dev)
-        return np.mean(scores)
+        from models.user import db
+        from utils.data_version_utils import MEMBERS
+        if cls._snapshot is None or not user_ids:
+            return
+        user_ids = list(dict.fromkeys(user_ids))
+        with cls._write_lock:
+            snapshot = cls._snapshot
+            members = {
+                member.user_id: member for member in db.session.query(
+                    GroupMember.user_id, GroupMember.group_id, GroupMember.skill,
+                    GroupMember.skill_vector, GroupMember.skill_vector_version
+                ).filter(GroupMember.user_id.in_(user_ids))
+            }
+            groups = snapshot.groups()
+            for user_id in user_ids:
+                if user_id in snapshot.member_groups:
+                    cls._drop_member_row(groups, snapshot.member_groups[user_id], user_id)
+            for user_id in user_ids:
+                member = members.get(user_id)
+                if member is None:
+                    continue
+                row = _sparse_row(cls._resolve_vector(member.skill, member.skill_vector, member.skill_vector_version))
+                if member.group_id in groups:
+                    member_ids, rows = groups[member.group_id]
+                    groups[member.group_id] = (member_ids + [user_id], rows + [row])
+                else:
+                    groups[member.group_id] = ([user_id], [row])
+            cls._snapshot = snapshot.with_members(groups, cls._advanced_data_version(snapshot, MEMBERS, written_version))
+
+    @classmethod
+    def remove_group(cls, group_id, written_version=None):
+        """小组删除后移除该组的技能行"""
+        from utils.data_version_utils import MEMBERS
+        if cls._snapshot is None:
+            return
+        with cls._write_lock:
+            snapshot = cls._snapshot
+            groups = snapshot.groups()
+            groups.pop(group_id, None)
+            cls._snapshot = snapshot.with_members(groups, cls._advanced_data_version(snapshot, MEMBERS, written_version))
+
+    @classmethod
+    def upsert_project(cls, project_id, written_version=None):
+        """项目上传或更新后，只重新分析这一个项目"""
+        cls.upsert_projects([project_id], written_version)
+
+    @classmethod
+    def upsert_projects(cls, project_ids, written_version=None):
+        """
+        批量上传的多个项目一次查询、修补后只发布一个快照，行范数和倒排索引只重新计算一次
+        """
+        from models.user import db
+        from utils.data_version_utils import PROJECTS
+        if cls._snapshot is None or not project_ids:
+            return
+        project_ids = list(dict.fromkeys(project_ids))
+        with cls._write_lock:
+            snapshot = cls._snapshot
+            projects = {
+                project.id: project for project in db.session.query(
+                    Project.id, Project.project_title, Project.required_skills,
+                    Project.skill_vector, Project.skill_vector_version
+                ).filter(Project.id.in_(project_ids))
+            }
+            rows = snapshot.project_rows()
+            names = list(snapshot.project_names)
+            ids = list(snapshot.project_ids)
+            positions = {pid: i for i, pid in enumerate(ids)}
+            removed = set()
+            for project_id in project_ids:
+                project = projects.get(project_id)
+                idx = positions.get(project_id)
+                vector = cls._resolve_vector(project.required_skills, project.skill_vector, project.skill_vector_version) if project else None
+
+                if project is None or count_skills(vector) < 3:
+                    # 项目不存在或技能太少，从推荐候选中移除
+                    if idx is not None:
+                        removed.add(idx)
+                elif idx is not None:
+                    rows[idx] = _sparse_row(vector)
+                    names[idx] = project.project_title
+                else:
+                    positions[project_id] = len(ids)
+                    rows.append(_sparse_row(vector))
+                    names.append(project.project_title)
+                    ids.append(project_id)
+            if removed:
+                keep = [i for i in range(len(ids)) if i not in removed]
+                rows = [rows[i] for i in keep]
+                names = [names[i] for i in keep]
+                ids = [ids[i] for i in keep]
+            cls._snapshot = snapshot.with_projects(
+                rows, names, ids, cls._advanced_data_version(snapshot, PROJECTS, written_version)
+            )
+
+    @classmethod
+    def remove_project(cls, project_id, written_version=None):
+        """项目删除后移除对应的行"""
+        from utils.data_version_utils import PROJECTS
+        if cls._snapshot is None:
+            return
+        with cls._write_lock:
+            snapshot = cls._snapshot
+            rows = snapshot.project_rows()
+            names = snapshot.project_names
+            ids = snapshot.project_ids
+            if project_id in ids:
+                idx = ids.index(project_id)
+                del rows[idx]
+                names = names[:idx] + names[idx + 1:]
+                ids = ids[:idx] + ids[idx + 1:]
+            cls._snapshot = snapshot.with_projects(
+                rows, names, ids, cls._advanced_data_version(snapshot, PROJECTS, written_version)
+            )
 
     @classmethod
-    def get_project_recommendations(cls, group_id=None, alpha=None, beta=None):
+    def get_project_recommendations(cls, group_id=None, alpha=None, beta=None, snapshot=None, workers=None):
         """
         获取项目推荐
         Args:
             group_id: 指定组ID，如果为None则返回所有组的推荐
             alpha: 匹配度权重
             beta: 互补度权重
+            snapshot: 使用的数据快照，默认为当前快照
+            workers: 全量计算的进程数，默认为配置的 RECOMMEND_RECOMPUTE_WORKERS
         """
         print("\n" + "="*20)
         print("开始项目推荐计算...")
         print(f"权重设置: α={alpha or cls._ALPHA}, β={beta or cls._BETA}")
         
-        from sklearn.preprocessing import minmax_scale
         if alpha is None:
             alpha = cls._ALPHA
         if beta is None:
             beta = cls._BETA
+        if snapshot is None:
+            snapshot = cls._snapshot
 
         if group_id is not None:
             # 为指定组计算推荐
             print(f"为指定组 {group_id} 计算推荐")
-            result = cls._get_recommendations_for_group(group_id, alpha, beta)
+            result = cls._get_recommendations_for_group(group_id, alpha, beta, snapshot)
             print(f"组 {group_id} 推荐完成，共 {len(result)} 个项目")
             return result
         else:
-            # 为所有组计算推荐
-            print(f"为所有 {len(cls._group_skills)} 个组计算推荐")
-            all_recommendations = {}
-            for gid in cls._group_skills.keys():
-                print(f"\n正在处理组 {gid}...")
-                all_recommendations[gid] = cls._get_recommendations_for_group(gid, alpha, beta)
-                print(f"组 {gid} 完成，推荐 {len(all_recommendations[gid])} 个项目")
+            # 为所有组批量计算推荐：单进程时所有组一次矩阵运算，多进程时按组分块并行
+            group_ids = list(snapshot.group_ids)
+            print(f"为所有 {len(group_ids)} 个组计算推荐")
+            if len(snapshot.project_ids) == 0:
+                print("没有项目数据，无法计算推荐")
+                return {gid: [] for gid in group_ids}
+            if workers is None:
+                workers = cls._recompute_workers
+            if workers > 1:
+                from recommend.parallel import rank_groups_parallel
+                print(f"使用 {workers} 个进程并行计算")
+                all_recommendations = rank_groups_parallel(group_ids, alpha, beta, snapshot, workers)
+            else:
+                all_recommendations = cls._rank_groups(group_ids, alpha, beta, snapshot)
             print(f"\n所有组推荐计算完成！")
             return all_recommendations
 
     @classmethod
-    def _get_recommendations_for_group(cls, group_id, alpha, beta):
-        """为指定组计算项目推荐"""
-        from sklearn.preprocessing import minmax_scale
-        
-        if group_id not in cls._group_skills:
-            print(f"  组 {group_id} 不在技能数据中，跳过")
-            return []
-        
-        group_skills = cls._group_skills[group_id]
-        group_vector = cls.compute_group_vector(group_skills)
+    def _score_groups(cls, group_ids, alpha, beta, snapshot=None):
+        """
+        批量计算多个组对候选项目的分数（G×P' 矩阵）
+        Returns:
+            (total_scores, weighted_match_scores, weighted_comp_scores, candidates):
+            前三项的列与 candidates（候选项目列号，升序）一一对应
+        """
+        if snapshot is None:
+            snapshot = cls._snapshot
+        match_scores_norm, comp_scores_norm, candidates = cls._normalized_scores(group_ids, snapshot)
+        return (*cls._weighted_scores(match_scores_norm, comp_scores_norm, alpha, beta), candidates)
 
-        if len(cls._project_skills) == 0:
-            print(f"  没有项目数据，组 {group_id} 无法计算推荐")
-            return []
+    @classmethod
+    def _normalized_scores(cls, group_ids, snapshot):
+        """
+        批量计算多个组对候选项目按行归一化后的匹配度、互补度（与权重无关）
+        与所选组没有任何共同技能的项目匹配度、互补度都为0，不参与计算：
+        候选项目由倒排索引得出，计算量与技能重叠的项目数成正比，而不是项目总数
+        Returns:
+            (match_scores_norm, comp_scores_norm, candidates)
+        """
+        candidates = cls._candidate_projects(group_ids, snapshot)
+        # 还有未计算的零分项目时，归一化的最小值按0计，与全部项目一起归一化的结果一致
+        has_zero_tail = len(candidates) < len(snapshot.project_ids)
+        if len(candidates) == 0:
+            empty = np.zeros((len(group_ids), 0))
+            return empty, empty, candidates
 
-        match_scores = cls.compute_match_scores(group_vector, cls._project_skills)
-        
-        project_comp_scores = []
-        for i, p in enumerate(cls._project_skills):
-            comp_score = cls.compute_project_aware_complementarity(group_skills, p)
-            project_comp_scores.append(comp_score)
+        if cls._matrix_backend == 'sparse':
+            match_scores, comp_totals = cls._sparse_scores(group_ids, snapshot, candidates)
+        else:
+            # 每组一行：组平均技能向量、组内每个技能维度的标准差（G×S）
+            group_vectors, group_stds = cls._group_statistics(group_ids, snapshot)
+
+            # 匹配度：G×P 余弦相似度（项目行范数已预先计算，零向量的相似度为0）
+            group_norms = np.linalg.norm(group_vectors, axis=1)
+            group_norms[group_norms == 0] = 1
+            project_norms = snapshot.project_norms[candidates]
+            project_norms = np.where(project_norms == 0, 1, project_norms)
+            projects = snapshot.dense_projects(candidates)  # 只展开候选项目的行
+            match_scores = (group_vectors @ projects.T) / group_norms[:, np.newaxis] / project_norms
+
+            # 项目相关互补度：标准差乘以项目需求掩码（需要的技能为1）后按项目求和
+            comp_totals = group_stds @ (projects > 0).astype(np.float32).T
+
+        # 按项目需要的技能数取均值
+        counts = snapshot.project_skill_counts[candidates]
+        comp_scores = np.divide(comp_totals, counts, out=np.zeros_like(comp_totals), where=counts > 0)
 
-        # 归一化
-        match_scores_norm = minmax_scale(match_scores)
-        comp_scores_norm = minmax_scale(project_comp_scores)
+        # 按行（每个组）归一化
+        match_scores_norm = cls._minmax_rows(match_scores, has_zero_tail)
+        comp_scores_norm = cls._minmax_rows(comp_scores, has_zero_tail)
+        return match_scores_norm, comp_scores_norm, candidates
 
+    @staticmethod
+    def _weighted_scores(match_scores_norm, comp_scores_norm, alpha, beta):
+        """
+        归一化分数加权求和
+        Returns:
+            (total_scores, weighted_match_scores, weighted_comp_scores)
+        """
         # 加权求和
         weighted_match_scores = alpha * match_scores_norm
         weighted_comp_scores = beta * comp_scores_norm
         total_scores = weighted_match_scores + weighted_comp_scores
         # 分数大于0.9的项减去0.1
         total_scores = np.where(total_scores > 0.9, total_scores - 0.1, total_scores)
+        return total_scores, weighted_match_scores, weighted_comp_scores
 
-        # 排名
-        ranked_indices = np.argsort(-total_scores)
-        recommendations = []
-        
-        # 修改：返回所有项目的推荐分数，而不是只返回前6个
-        for rank, idx in enumerate(ranked_indices, 1):
-            project_name = cls._project_names[idx]
-            final_score = round(float(total_scores[idx]), 4)
-            match_score = round(float(weighted_match_scores[idx]), 4)
-            comp_score = round(float(weighted_comp_scores[idx]), 4)
-            
-            # 只打印前6个用于调试
-            if rank <= 6:
-                pass # 删除所有print相关的调试输出
-            
-            recommendations.append({
+    @classmethod
+    def _candidate_projects(cls, group_ids, snapshot):
+        """所选组成员掌握的技能 -> 倒排索引 -> 至少共享一个技能的项目列号（升序）"""
+        _, _, member_rows = cls._group_segments(group_ids, snapshot)
+        return snapshot.projects_with_skills(snapshot.member_skill_ids(member_rows))
+
+    @staticmethod
+    def _minmax_rows(scores, include_zero=False):
+        """
+        按行 min-max 归一化，计算方式与 sklearn 的 minmax_scale(axis=1) 一致；
+        include_zero 为 True 时，未计算的零分项目也算在每行的最小值、最大值里
+        """
+        lo = scores.min(axis=1)
+        hi = scores.max(axis=1)
+        if include_zero:
+            lo = np.minimum(lo, 0)
+            hi = np.maximum(hi, 0)
+        data_range = hi - lo
+        # 近似为常数的行不缩放
+        data_range[data_range < 10 * np.finfo(data_range.dtype).eps] = 1
+        scale = 1 / data_range
+        return scores * scale[:, np.newaxis] + (-lo * scale)[:, np.newaxis]
+
+    @classmethod
+    def _group_segments(cls, group_ids, snapshot):
+        """
+        所选组在成员矩阵中的分段
+        Returns:
+            (sizes, segment_starts, member_rows): 每组人数、按所选顺序拼接后每组的起始行、
+            拼接用的成员行号（所选组恰好是全部组且顺序不变时为 None，直接使用整个成员矩阵）
+        """
+        rows = np.array([snapshot.group_rows[gid] for gid in group_ids], dtype=np.int64)
+        starts = snapshot.group_offsets[rows]
+        sizes = snapshot.group_offsets[rows + 1] - starts
+        segment_starts = np.cumsum(sizes) - sizes
+        if np.array_equal(starts, segment_starts) and sizes.sum() == len(snapshot.member_ids):
+            return sizes, segment_starts, None
+        member_rows = np.repeat(starts - segment_starts, sizes) + np.arange(sizes.sum())
+        return sizes, segment_starts, member_rows
+
+    @classmethod
+    def _group_statistics(cls, group_ids, snapshot):
+        """
+        按成员矩阵的分段一次归约出多个组的平均技能向量和各技能维度的标准差
+        Returns:
+            (group_vectors, group_stds): 均为 G×S 的 float64 矩阵
+        """
+        sizes, segment_starts, member_rows = cls._group_segments(group_ids, snapshot)
+        # 只展开所选组的成员行（全部组按原顺序时展开整个成员矩阵）
+        members = snapshot.dense_members(member_rows).astype(np.float64)
+        group_vectors = np.add.reduceat(members, segment_starts, axis=0) / sizes[:, np.newaxis]
+        deviations = members - np.repeat(group_vectors, sizes, axis=0)
+        group_stds = np.sqrt(np.add.reduceat(deviations * deviations, segment_starts, axis=0) / sizes[:, np.newaxis])
+        return group_vectors, group_stds
+
+    @classmethod
+    def _sparse_scores(cls, group_ids, snapshot, candidates):
+        """
+        稀疏后端：成员矩阵、项目矩阵均为 CSR，组均值、标准差、余弦相似度只在非零元素上计算
+        Returns:
+            (match_scores, comp_totals): 对候选项目（G×P'）的余弦相似度和互补度（未按技能数取均值）
+        """
+        from scipy import sparse
+
+        members = snapshot.sparse_members()
+        projects, mask = snapshot.sparse_projects()
+        projects, mask = projects[candidates], mask[candidates]
+        sizes, segment_starts, member_rows = cls._group_segments(group_ids, snapshot)
+        if member_rows is None:
+            member_rows = np.arange(members.shape[0])
+
+        # 组指示矩阵（G×M）：一次稀疏乘法得到各组的技能和与平方和
+        indicator = sparse.csr_matrix(
+            (np.ones(len(member_rows)), (np.repeat(np.arange(len(sizes)), sizes), member_rows)),
+            shape=(len(sizes), members.shape[0])
+        )
+        sums = indicator @ members
+        square_sums = indicator @ members.multiply(members)
+
+        # 技能等级是整数，方差分子 n·Σx² − (Σx)² 在 float64 下精确，组内相同的技能标准差精确为0
+        inverse_sizes = sparse.diags(1.0 / sizes)
+        group_vectors = inverse_sizes @ sums
+        variance_numerators = sparse.diags(sizes.astype(np.float64)) @ square_sums - sums.multiply(sums)
+        variance_numerators.data = np.maximum(variance_numerators.data, 0)
+        group_stds = inverse_sizes @ variance_numerators.sqrt()
+
+        # 匹配度：余弦相似度
+        group_norms = np.sqrt(np.asarray(group_vectors.multiply(group_vectors).sum(axis=1)).ravel())
+        group_norms[group_norms == 0] = 1
+        project_norms = snapshot.project_norms[candidates]
+        project_norms = np.where(project_norms == 0, 1, project_norms)
+        match_scores = (group_vectors @ projects.T).toarray() / group_norms[:, np.newaxis] / project_norms
+
+        comp_totals = (group_stds @ mask.T).toarray()
+        return match_scores, comp_totals
+
+    @classmethod
+    def _rank_groups(cls, group_ids, alpha, beta, snapshot=None):
+        """批量计算并排名，返回 {group_id: 推荐列表}"""
+        if snapshot is None:
+            snapshot = cls._snapshot
+        if not group_ids:
+            return {}
+        total_scores, weighted_match_scores, weighted_comp_scores, candidates = cls._rounded_scores(
+            group_ids, alpha, beta, snapshot
+        )
+        return {
+            gid: cls._rank_row(
+                snapshot, candidates, total_scores[row], weighted_match_scores[row], weighted_comp_scores[row]
+            )
+            for row, gid in enumerate(group_ids)
+        }
+
+    @classmethod
+    def _rounded_scores(cls, group_ids, alpha, beta, snapshot):
+        """
+        计算分数并抹掉矩阵运算的末位浮点误差（矩阵行数不同时 BLAS 累加顺序不同），
+        保证单组与批量计算的分数、排名逐位一致
+        """
+        *scores, candidates = cls._score_groups(group_ids, alpha, beta, snapshot)
+        return (*(np.round(m, 10) for m in scores), candidates)
+
+    @classmethod
+    def _cached_group_scores(cls, group_id, alpha, beta, snapshot):
+        """
+        单组的分数行（total, match, comp, candidates），先查结果缓存
+        同一组的成员反复刷新推荐页时，只有第一次做矩阵运算，之后只是一次字典查找和本页排名；
+        换一组权重时复用缓存的归一化匹配度、互补度，只做一次加权求和
+        """
+        key = ('scores', group_id, float(alpha), float(beta))
+        scores = cls._result_cache.get(snapshot.serial, key)
+        if scores is None:
+            match_row, comp_row, candidates = cls._cached_group_components(group_id, snapshot)
+            # 与 _rounded_scores 相同：加权后抹掉末位浮点误差
+            scores = (
+                *(np.round(m, 10) for m in cls._weighted_scores(match_row, comp_row, alpha, beta)),
+                candidates
+            )
+            for array in scores:
+                array.flags.writeable = False  # 缓存的结果被多个请求共用
+            cls._result_cache.put(snapshot.serial, key, scores)
+        return scores
+
+    @classmethod
+    def _cached_group_components(cls, group_id, snapshot):
+        """单组按行归一化后的匹配度、互补度（match_row, comp_row, candidates），与权重无关"""
+        key = ('components', group_id)
+        components = cls._result_cache.get(snapshot.serial, key)
+        if components is None:
+            match_scores_norm, comp_scores_norm, candidates = cls._normalized_scores([group_id], snapshot)
+            components = (match_scores_norm[0], comp_scores_norm[0], candidates)
+            for array in components:
+                array.flags.writeable = False
+            cls._result_cache.put(snapshot.serial, key, components)
+        return components
+
+    @classmethod
+    def _rank_row(cls, snapshot, candidates, total_row, match_row, comp_row, start=0, stop=None):
+        """
+        一个组排名第 start+1 到 stop 名的推荐（stop 为 None 时到最后一名）
+        分数为正的候选项目按分数从高到低排在前面，同分按项目顺序；
+        其余项目（零分候选项目和没有共同技能的项目）都是0分，按项目顺序排在末尾。
+        只要前 stop 名时先用 argpartition 选出前 k 个再排序，不对全部项目排序
+        """
+        project_count = len(snapshot.project_ids)
+        stop = project_count if stop is None else min(stop, project_count)
+        positive = np.flatnonzero(total_row > 0)
+        if stop < len(positive):
+            # 第 stop 名的分数作为阈值，与阈值同分的项目全部保留，保证并列时仍按项目顺序取舍
+            top = np.argpartition(-total_row[positive], stop - 1)[:stop]
+            positive = positive[total_row[positive] >= total_row[positive[top]].min()]
+        ranked = positive[np.argsort(-total_row[positive], kind='stable')][:stop]
+
+        project_ids = snapshot.project_ids
+        project_names = snapshot.project_names
+        page = ranked[start:]
+        # 整列 tolist() 转成 Python float 再取整，避免逐个元素转换 numpy 标量
+        recommendations = [
+            {
                 'rank': rank,
-                'project_id': cls._project_ids[idx],
-                'project_name': project_name,
-                'final_score': final_score,
-                'match_score': match_score,
-                'complementarity_score': comp_score,
+                'project_id': project_ids[project],
+                'project_name': project_names[project],
+                'final_score': round(total, 4),
+                'match_score': round(match, 4),
+                'complementarity_score': round(comp, 4),
+            }
+            for rank, project, total, match, comp in zip(
+                range(start + 1, start + 1 + len(page)), candidates[page].tolist(),
+                total_row[page].tolist(), match_row[page].tolist(), comp_row[page].tolist()
+            )
+        ]
+        if stop > len(ranked):
+            # 走到这里说明 positive 未被截断，包含了全部正分项目
+            zero_tail = np.ones(project_count, dtype=bool)
+            zero_tail[candidates[positive]] = False
+            tail_start = max(start - len(ranked), 0)
+            tail = np.flatnonzero(zero_tail)[tail_start:stop - len(ranked)].tolist()
+            recommendations.extend(
+                {
+                    'rank': rank,
+                    'project_id': project_ids[project],
+                    'project_name': project_names[project],
+                    'final_score': 0.0,
+                    'match_score': 0.0,
+                    'complementarity_score': 0.0,
+                }
+                for rank, project in enumerate(tail, len(ranked) + tail_start + 1)
+            )
+        return recommendations
+
+    @classmethod
+    def get_top_recommendations(cls, group_id, limit=None, offset=0, alpha=None, beta=None, snapshot=None):
+        """
+        指定组的一页推荐：排名第 offset+1 到 offset+limit 名（limit 为 None 时到最后一名）
+        Returns:
+            (recommendations, total): 本页推荐列表、可推荐的项目总数；组不在技能数据中时为 ([], 0)
+        """
+        if alpha is None:
+            alpha = cls._ALPHA
+        if beta is None:
+            beta = cls._BETA
+        if snapshot is None:
+            snapshot = cls._snapshot
+        if group_id not in snapshot.group_rows or len(snapshot.project_ids) == 0:
+            return [], 0
+
+        total_row, match_row, comp_row, candidates = cls._cached_group_scores(group_id, alpha, beta, snapshot)
+        stop = None if limit is None else offset + limit
+        recommendations = cls._rank_row(
+            snapshot, candidates, total_row, match_row, comp_row, start=offset, stop=stop
+        )
+        return recommendations, len(snapshot.project_ids)
+
+    @classmethod
+    def allocate_projects(cls, capacities, alpha=None, beta=None, snapshot=None):
+        """
+        带容量约束的全局分配：在所有组 × 所有项目的分数矩阵上求总分最大的分配（recommend/allocation.py）
+        Args:
+            capacities: {项目ID: 可接收的组数}，缺少的项目按默认容量
+        Returns:
+            list: 每个组一项 {'group_id', 'project_id', 'project_name', 'final_score', 'rank'}，
+            没分到项目的组 project_id 为 None；rank 为该项目在本组推荐列表中的名次
+        """
+        from recommend.allocation import allocate, choice_ranks, DEFAULT_GROUP_CAPACITY
+
+        if alpha is None:
+            alpha = cls._ALPHA
+        if beta is None:
+            beta = cls._BETA
+        if snapshot is None:
+            snapshot = cls._snapshot
+        group_ids = list(snapshot.group_ids)
+        if not group_ids:
+            return []
+
+        # 候选项目之外的分数都为0，补成完整的 G×P 矩阵
+        scores = np.zeros((len(group_ids), len(snapshot.project_ids)))
+        if len(snapshot.project_ids):
+            total_scores, _, _, candidates = cls._rounded_scores(group_ids, alpha, beta, snapshot)
+            scores[:, candidates] = total_scores
+        project_capacities = [capacities.get(pid, DEFAULT_GROUP_CAPACITY) for pid in snapshot.project_ids]
+        assignment = allocate(scores, project_capacities)
+        ranks = choice_ranks(scores, assignment)
+
+        allocations = []
+        for row, gid in enumerate(group_ids):
+            project = assignment[row]
+            assigned = project >= 0
+            allocations.append({
+                'group_id': gid,
+                'project_id': snapshot.project_ids[project] if assigned else None,
+                'project_name': snapshot.project_names[project] if assigned else None,
+                'final_score': round(float(scores[row, project]), 4) if assigned else None,
+                'rank': int(ranks[row]) if assigned else None,
             })
-        
+        return allocations
+
+    @classmethod
+    def _get_recommendations_for_group(cls, group_id, alpha, beta, snapshot=None):
+        """为指定组计算项目推荐"""
+        if snapshot is None:
+            snapshot = cls._snapshot
+        if group_id not in snapshot.group_rows:
+            print(f"  组 {group_id} 不在技能数据中，跳过")
+            return []
+
+        if len(snapshot.project_ids) == 0:
+            print(f"  没有项目数据，组 {group_id} 无法计算推荐")
+            return []
+
+        # 与批量计算共用同一套矩阵运算，保证单组与全量结果一致
+        total_row, match_row, comp_row, candidates = cls._cached_group_scores(group_id, alpha, beta, snapshot)
+        recommendations = cls._rank_row(snapshot, candidates, total_row, match_row, comp_row)
         print(f"  组 {group_id} 推荐计算完成，共 {len(recommendations)} 个项目（保存所有项目）")
         return recommendations
 
     @classmethod
-    def update_recommendations_in_db(cls, all_recommendations):
+    def update_recommendations_in_db(cls, all_recommendations, chunk_size=1000):
         """
-        更新数据库中的推荐分数
+        批量更新数据库中的推荐分数
+        一次查出受影响组的已有记录，再分块批量更新 / 插入，往返次数与组数、项目数无关
+        推荐分数或推荐的组有变化的项目记入 project_recommendation_changes，供项目列表增量同步
+        多个进程（每个 WSGI worker 都有自己的后台预计算线程）同时写入时，靠 recommendations 版本行的行锁串行执行
         Args:
             all_recommendations: 所有组的推荐结果字典
+            chunk_size: 每批写入的行数
         """
         from models.group_project_recommendation import GroupProjectRecommendation
         from models.user import db
-        from datetime import datetime, timezone, timedelta
-        
-        def get_australia_time():
-            """获取澳洲东部时间（AEST/AEDT）"""
-            australia_tz = timezone(timedelta(hours=10))  # UTC+10
-            return datetime.now(australia_tz)
-        
+        from project.dao import mark_recommendations_changed
+        from utils.data_version_utils import RECOMMENDATIONS, bump_data_version
+        from utils.time_utils import get_australia_time
+
+        def chunks(items):
+            for start in range(0, len(items), chunk_size):
+                yield items[start:start + chunk_size]
+
         print("\n开始更新数据库推荐分数...")
         
         try:
-            updated_count = 0
-            created_count = 0
-            
-            # 为每个组更新推荐分数
+            # 先结束之前的读事务，再递增 recommendations 版本号（同时使项目列表 / 组列表的 ETag 失效）：
+            # UPDATE 持有该行的行锁直到提交，
+            # 其他进程的写入在这里等待；拿到锁之后才查询已有记录，能看到前一个进程刚提交的行，不会重复插入
+            db.session.commit()
+            bump_data_version(RECOMMENDATIONS)
+
+            group_ids = list(all_recommendations.keys())
+
+            # 1. 一次查出受影响组的已有记录：(group_id, project_id) -> (id, final_score)
+            existing = {}
+            stale_ids = []
+            changed_projects = set()  # 推荐记录有变化的项目
+            for group_chunk in chunks(group_ids):
+                rows = db.session.query(
+                    GroupProjectRecommendation.id,
+                    GroupProjectRecommendation.group_id,
+                    GroupProjectRecommendation.project_id,
+                    GroupProjectRecommendation.final_score
+                ).filter(GroupProjectRecommendation.group_id.in_(group_chunk)).all()
+                for rec_id, group_id, project_id, final_score in rows:
+                    if (group_id, project_id) in existing:
+                        stale_ids.append(rec_id)  # 重复记录
+                        changed_projects.add(project_id)
+                    else:
+                        existing[(group_id, project_id)] = (rec_id, final_score)
+
+            # 2. 区分更新与新增
+            now = get_australia_time()
+            updates = []
+            inserts = []
             for group_id, recommendations in all_recommendations.items():
                 for rec in recommendations:
-                    # 查找现有记录
-                    existing_rec = GroupProjectRecommendation.query.filter_by(
-                        group_id=group_id,
-                        project_id=rec['project_id']
-                    ).first()
-                    
-                    if existing_rec:
-                        # 更新现有记录
-                        existing_rec.final_score = rec['final_score']
-                        existing_rec.rank = rec['rank']
-                        existing_rec.match_score = rec['match_score']
-                        existing_rec.complementarity_score = rec['complementarity_score']
-                        existing_rec.created_at = get_australia_time()
-                        updated_count += 1
+                    row = {
+                        'group_id': group_id,
+                        'project_id': rec['project_id'],
+                        'final_score': rec['final_score'],
+                        'rank': rec['rank'],
+                        'match_score': rec['match_score'],
+                        'complementarity_score': rec['complementarity_score'],
+                        'created_at': now,
+                    }
+                    old = existing.pop((group_id, rec['project_id']), None)
+                    if old is not None:
+                        row['id'] = old[0]
+                        updates.append(row)
+                        # 分数列可能是单精度 FLOAT，读回的值与写入的4位小数有微小差异，不算变化
+                        if not math.isclose(old[1], rec['final_score'], abs_tol=1e-6):
+                            changed_projects.add(rec['project_id'])
                     else:
-                        # 创建新记录
-                        new_rec = GroupProjectRecommendation(
-                            group_id=group_id,
-                            project_id=rec['project_id'],
-                            final_score=rec['final_score'],
-                            rank=rec['rank'],
-                            match_score=rec['match_score'],
-                            complementarity_score=rec['complementarity_score'],
-                            created_at=get_australia_time()
-                        )
-                        db.session.add(new_rec)
-                        created_count += 1
+                        inserts.append(row)
+                        changed_projects.add(rec['project_id'])
+            # 本次结果中已不存在的项目（已删除或技能不足被排除），删除旧记录避免排名重复
+            for (_, project_id), (rec_id, _) in existing.items():
+                stale_ids.append(rec_id)
+                changed_projects.add(project_id)
+
+            # 3. 分块批量写入
+            for chunk in chunks(updates):
+                db.session.bulk_update_mappings(GroupProjectRecommendation, chunk)
+            for chunk in chunks(inserts):
+                db.session.bulk_insert_mappings(GroupProjectRecommendation, chunk)
+            for chunk in chunks(stale_ids):
+                GroupProjectRecommendation.query.filter(
+                    GroupProjectRecommendation.id.in_(chunk)
+                ).delete(synchronize_session=False)
+            mark_recommendations_changed(changed_projects)
             
             # 提交所有更改
             db.session.commit()
-            print(f"数据库推荐分数更新完成！更新: {updated_count} 条，新增: {created_count} 条")
+            print(f"数据库推荐分数更新完成！更新: {len(updates)} 条，新增: {len(inserts)} 条，删除: {len(stale_ids)} 条，"
+                  f"推荐有变化的项目: {len(changed_projects)} 个")
             
         except Exception as e:
             print(f"更新数据库时出错: {e}")
@@ -0,0 +1,141 @@
+import contextlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，此时不启用共享快照
+    fcntl = None
+
+
+class SnapshotStore:
+    """
+    推荐数据快照的文件存储，供同一台机器上的多个 worker 进程共享
+    每个数据版本一个目录，内含成员、项目技能的 CSR 数组和项目的行范数、技能数、倒排索引（.npy），
+    以及 JSON 索引（组分段、ID 映射）；
+    worker 以 mmap 只读方式加载，多个进程共用操作系统的同一份页缓存，
+    只有拿到文件锁的一个进程从数据库重建，其他进程等它写完后直接加载
+    """
+
+    INDEX_FILE = 'index.json'
+    # 每个数组一个 .npy 文件，文件名即快照的属性名
+    MEMBER_ARRAYS = ('member_indptr', 'member_indices', 'member_data')
+    PROJECT_ARRAYS = ('project_indptr', 'project_indices', 'project_data')
+    LAYOUT_VERSION = 2  # 文件布局版本，布局变化后旧目录不再被读取
+    KEEP_VERSIONS = 2  # 保留的最近版本数，旧版本目录在发布新版本后删除
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def available():
+        return fcntl is not None
+
+    @staticmethod
+    def version_key(data_version):
+        """数据版本号 + 技能向量版本号 + 文件布局版本组成目录名，技能词表或布局变化后旧快照自动失效"""
+        from recommend.service import SKILL_VECTOR_VERSION
+        parts = [f"{scope}-{data_version[scope]}" for scope in sorted(data_version)]
+        return '_'.join(parts + [SKILL_VECTOR_VERSION, f"v{SnapshotStore.LAYOUT_VERSION}"])
+
+    @contextlib.contextmanager
+    def lock(self):
+        """跨进程互斥锁，保证同一时刻只有一个进程重建快照"""
+        with open(os.path.join(self.directory, '.lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self, data_version):
+        """
+        以 mmap 方式加载指定数据版本的快照
+        Returns:
+            RecommendSnapshot，不存在时返回 None
+        """
+        path = os.path.join(self.directory, self.version_key(data_version))
+        if not os.path.isdir(path):
+            return None
+        return self.load_path(path)
+
+    @classmethod
+    def load_path(cls, path):
+        """以 mmap 方式加载 save 写入的快照目录（全量重算的子进程按目录加载，不经过数据版本号）"""
+        from recommend.service import RecommendSnapshot
+
+        with open(os.path.join(path, cls.INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        members = tuple(cls._load_array(os.path.join(path, f"{name}.npy")) for name in cls.MEMBER_ARRAYS)
+        projects = tuple(cls._load_array(os.path.join(path, f"{name}.npy")) for name in cls.PROJECT_ARRAYS)
+        derived = {name: cls._load_array(os.path.join(path, f"{name}.npy")) for name in RecommendSnapshot.PROJECT_DERIVED}
+
+        # 快照直接引用 mmap 的数组，不复制数据，也不重新计算行范数和倒排索引
+        snapshot = RecommendSnapshot(
+            members, index['member_ids'], index['group_ids'], index['group_offsets'],
+            projects, index['project_names'], index['project_ids'], index['data_version'], derived
+        )
+        snapshot.path = path
+        return snapshot
+
+    def save(self, snapshot, key=None):
+        """
+        写入快照：先写临时目录，再整体改名发布，读取方不会看到写了一半的文件
+        Args:
+            key: 目录名，默认由快照的数据版本号生成
+        Returns:
+            发布后的快照目录
+        """
+        from recommend.service import RecommendSnapshot
+
+        if key is None:
+            key = self.version_key(snapshot.data_version)
+        final_path = os.path.join(self.directory, key)
+        if os.path.isdir(final_path):
+            return final_path
+        tmp_path = os.path.join(self.directory, f".{key}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        for name in self.MEMBER_ARRAYS + self.PROJECT_ARRAYS + RecommendSnapshot.PROJECT_DERIVED:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(snapshot, name))
+        index = {
+            'data_version': snapshot.data_version,
+            'group_ids': snapshot.group_ids,
+            'group_offsets': snapshot.group_offsets.tolist(),
+            'member_ids': snapshot.member_ids,
+            'project_ids': snapshot.project_ids,
+            'project_names': snapshot.project_names,
+        }
+        with open(os.path.join(tmp_path, self.INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+
+        try:
+            os.replace(tmp_path, final_path)
+        except OSError:
+            # 其他进程已发布同一版本
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return final_path
+        self._prune(keep=final_path)
+        return final_path
+
+    def _prune(self, keep):
+        """删除旧版本目录（已 mmap 的进程仍可继续读取已删除的文件）"""
+        entries = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if not name.startswith('.')
+        ]
+        entries = sorted((p for p in entries if os.path.isdir(p)), key=os.path.getmtime, reverse=True)
+        for path in entries[self.KEEP_VERSIONS:]:
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _load_array(path):
+        array = np.load(path, mmap_mode='r')
+        # 空数组无法 mmap，np.load 会退回普通数组，这里统一处理
+        return array if array.size else np.load(path)
@@ -0,0 +1,129 @@
+import threading
+import time
+import traceback
+
+
+class RecommendWorker:
+    """
+    推荐预计算后台线程
+    写入路径调用 enqueue() 登记受影响的组，线程在一段静默期后合并处理：
+    重新计算这些组的推荐并写入 group_project_recommendation 表，
+    供 /api/staff/groups 和 /api/student/projects（topGroups）读取
+    """
+
+    def __init__(self, app, debounce=2.0, max_delay=30.0):
+        """
+        Args:
+            app: Flask 应用实例，后台线程在它的应用上下文中访问数据库
+            debounce: 静默期（秒），最后一次登记后这么久没有新变化才开始计算
+            max_delay: 最长等待（秒），持续有写入时也不会无限推迟
+        """
+        self._app = app
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._cond = threading.Condition()
+        self._pending_groups = set()
+        self._pending_all = False
+        self._first_event = None
+        self._last_event = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='recommend-worker', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, group_ids=None):
+        """
+        登记需要重新计算的组
+        Args:
+            group_ids: 组ID列表；为 None 时表示所有组（项目变化会影响每个组的归一化分数）
+        """
+        with self._cond:
+            if group_ids is None:
+                self._pending_all = True
+            else:
+                self._pending_groups.update(group_ids)
+            now = time.monotonic()
+            self._last_event = now
+            if self._first_event is None:
+                self._first_event = now
+            self._cond.notify()
+
+    def _take_batch(self):
+        """等到有待处理的变化且已静默 debounce 秒（或累计等待超过 max_delay），取出这一批"""
+        with self._cond:
+            while True:
+                if self._first_event is None:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                ready_at = min(self._last_event + self._debounce, self._first_event + self._max_delay)
+                if now >= ready_at:
+                    break
+                self._cond.wait(ready_at - now)
+            batch = (self._pending_all, self._pending_groups)
+            self._pending_all = False
+            self._pending_groups = set()
+            self._first_event = self._last_event = None
+            return batch
+
+    def _run(self):
+        while True:
+            recompute_all, group_ids = self._take_batch()
+            try:
+                with self._app.app_context():
+                    self.recompute(None if recompute_all else group_ids)
+            except Exception as e:
+                print(f"推荐预计算失败: {e}", flush=True)
+                traceback.print_exc()
+
+    @staticmethod
+    def recompute(group_ids=None):
+        """
+        重新计算并写入推荐分数（需在应用上下文中调用）
+        Args:
+            group_ids: 组ID集合；为 None 时计算所有组
+        """
+        from recommend.service import RecommendService
+
+        snapshot = RecommendService.load_data_from_db()
+        if len(snapshot.project_ids) == 0:
+            return
+        if group_ids is None:
+            recommendations = RecommendService.get_project_recommendations(snapshot=snapshot)
+        else:
+            # 已删除或没有成员的组直接跳过
+            group_ids = [gid for gid in group_ids if gid in snapshot.group_rows]
+            if not group_ids:
+                return
+            recommendations = RecommendService._rank_groups(
+                group_ids, RecommendService._ALPHA, RecommendService._BETA, snapshot
+            )
+        RecommendService.update_recommendations_in_db(recommendations)
+        print(f"推荐预计算完成，共 {len(recommendations)} 个组", flush=True)
+
+
+_worker = None
+
+
+def init_recommend_worker(app):
+    """创建并启动后台预计算线程（应用启动时调用）"""
+    global _worker
+    if not app.config.get('RECOMMEND_WORKER_ENABLED', True):
+        return None
+    _worker = RecommendWorker(
+        app,
+        debounce=app.config.get('RECOMMEND_WORKER_DEBOUNCE', 2.0),
+        max_delay=app.config.get('RECOMMEND_WORKER_MAX_DELAY', 30.0),
+    )
+    _worker.start()
+    if app.config.get('RECOMMEND_PRECOMPUTE_ON_START', True):
+        _worker.enqueue()
+    return _worker
+
+
+def enqueue_recompute(group_ids=None):
+    """写入路径调用：登记需要重新计算的组；后台线程未启动时不做任何事"""
+    if _worker is not None:
+        _worker.enqueue(group_ids)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+推荐分数全量重算脚本
+为所有组重新计算推荐并写入 group_project_recommendation 表；
+组很多时用 --workers 按组分块多进程并行计算
+
+用法: python recompute_recommendations.py [--workers 4] [--alpha 0.7 --beta 0.3] [--dry-run]
+"""
+
+import argparse
+import os
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全量重算推荐分数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行进程数，默认为 CPU 核数')
+    parser.add_argument('--alpha', type=float, default=None, help='匹配度权重，默认 0.7')
+    parser.add_argument('--beta', type=float, default=None, help='互补度权重，默认 0.3')
+    parser.add_argument('--dry-run', action='store_true', help='只计算不写入数据库')
+    args = parser.parse_args()
+
+    # 脚本自己做全量计算，不启动应用内的后台预计算线程
+    os.environ.setdefault('RECOMMEND_WORKER_ENABLED', '0')
+    from app import app
+    from recommend.service import RecommendService
+
+    with app.app_context():
+        snapshot = RecommendService.load_data_from_db()
+        start = time.perf_counter()
+        recommendations = RecommendService.get_project_recommendations(
+            alpha=args.alpha, beta=args.beta, snapshot=snapshot, workers=args.workers
+        )
+        print(f"计算 {len(recommendations)} 个组用时 {time.perf_counter() - start:.2f} 秒（{args.workers} 个进程）")
+        if not args.dry_run:
+            RecommendService.update_recommendations_in_db(recommendations)
+    print("推荐分数重算完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -200,9 +200,12 @@ def update_profile():
         # 新增：同步 group_members 表
         from models.group import GroupMember
         group_member = GroupMember.query.filter_by(user_id=user_id).first()
-        if group_member:
+        if group_member and group_member.name != name:
             group_member.name = name
             from models.user import db
+            from utils.data_version_utils import PROFILES, bump_data_version
+            # 组成员名字只出现在组列表中：递增展示信息的版本号使其 ETag 失效，不影响推荐快照
+            bump_data_version(PROFILES)
             db.session.commit()
         return jsonify({'status': '200'})
     except Exception as e:
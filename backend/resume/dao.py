@@ -23,6 +23,10 @@ def save_resume_to_db(user_id, name, email, major, skill):
         major: 专业
         skill: 技能
     """
+    # 技能向量在保存时计算一次，推荐加载时直接解码
+    from recommend.service import compute_skill_vector
+    skill_vector, skill_vector_version = compute_skill_vector(skill)
+
     # 查找是否已存在记录
     resume = StudentResume.query.filter_by(user_id=user_id).first()
     
@@ -32,6 +36,8 @@ def save_resume_to_db(user_id, name, email, major, skill):
         resume.email = email
         resume.major = major
         resume.skill = skill
+        resume.skill_vector = skill_vector
+        resume.skill_vector_version = skill_vector_version
     else:
         # 创建新记录
         resume = StudentResume(
@@ -39,15 +45,38 @@ def save_resume_to_db(user_id, name, email, major, skill):
             name=name,
             email=email,
             major=major,
-            skill=skill
+            skill=skill,
+            skill_vector=skill_vector,
+            skill_vector_version=skill_vector_version
         )
         db.session.add(resume)
     # 同步 group_members 表
     from models.group import GroupMember
     group_members = GroupMember.query.filter_by(user_id=user_id).all()
+    vector_changed = any(
+        member.skill_vector != skill_vector or member.skill_vector_version != skill_vector_version
+        for member in group_members
+    )
     for member in group_members:
         member.skill = skill
+        member.skill_vector = skill_vector
+        member.skill_vector_version = skill_vector_version
+    written_version = None
+    if vector_changed:
+        # 组员技能向量变化，推荐缓存需要刷新
+        from utils.data_version_utils import bump_data_version, MEMBERS
+        written_version = bump_data_version(MEMBERS)[MEMBERS]
+    elif group_members:
+        # 技能向量不变，只是专业、技能原文等展示信息可能变化：只让组列表的 ETag 失效
+        from utils.data_version_utils import bump_data_version, PROFILES
+        bump_data_version(PROFILES)
     db.session.commit()
+    if vector_changed:
+        # 只增量更新该组员的技能向量
+        from recommend.service import RecommendService
+        from recommend.worker import enqueue_recompute
+        RecommendService.upsert_member(user_id, written_version)
+        enqueue_recompute({member.group_id for member in group_members})
 
 # 新增：查询学生简历
 
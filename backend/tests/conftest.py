@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试按 backend 目录下的模块路径导入（与应用运行时一致）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
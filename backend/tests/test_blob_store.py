@@ -0,0 +1,35 @@
+import os
+import time
+
+import pytest
+
+from utils.blob_store import BlobStore, LocalBlobStore
+
+
+def test_blob_store_is_abstract():
+    with pytest.raises(TypeError):
+        BlobStore()
+
+
+def test_delete_and_list(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    first, _ = store.put(b'first')
+    second, _ = store.put(b'second')
+    assert sorted(key for key, _ in store.list_blobs()) == sorted([first, second])
+
+    assert store.delete(first)
+    assert not store.exists(first)
+    assert not store.delete(first)
+    assert [key for key, _ in store.list_blobs()] == [second]
+
+
+def test_put_existing_refreshes_modified_time(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    key, _ = store.put(b'content')
+    old = time.time() - 7200
+    os.utime(store.local_path(key), (old, old))
+    assert store.modified_at(key) == pytest.approx(old)
+
+    store.put(b'content')
+    assert store.modified_at(key) > old
+    assert store.modified_at('0' * 64) is None
@@ -0,0 +1,26 @@
+import pytest
+
+from recommend.benchmark import legacy_analyze_skill_strength, load_sample_texts
+from recommend.service import analyze_skill_strength
+
+EDGE_CASES = [
+    "i know c++ and c# well",
+    "Expert in Vue.js, Next.js and Node.js; basic JavaScript",
+    "proficient with Google Cloud, familiar with cloud computing",
+    "hands-on React Native experience\nunderstanding of react",
+    "well-versed in SQL, knowledge of machine learning. used Docker and AWS",
+    "",
+]
+
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_matcher_matches_legacy_on_edge_cases(text):
+    assert analyze_skill_strength(text) == legacy_analyze_skill_strength(text)
+
+
+def test_matcher_matches_legacy_on_sample_files():
+    texts = load_sample_texts()
+    if not texts:
+        pytest.skip('没有 resume_uploads / staff_project 样本文件')
+    mismatches = [i for i, t in enumerate(texts) if analyze_skill_strength(t) != legacy_analyze_skill_strength(t)]
+    assert mismatches == []
@@ -0,0 +1,32 @@
+import numpy as np
+
+from recommend.benchmark import random_groups, random_vectors
+from recommend.parallel import rank_groups_parallel
+from recommend.service import RecommendService, RecommendSnapshot
+from recommend.snapshot_store import SnapshotStore
+
+
+def make_snapshot(seed, data_version):
+    rng = np.random.default_rng(seed)
+    return RecommendSnapshot(
+        *RecommendSnapshot.pack_groups(random_groups(rng, 40, 3)),
+        RecommendSnapshot.pack_projects(random_vectors(rng, 20, 6)),
+        [f"p{i}" for i in range(20)], list(range(20)), data_version
+    )
+
+
+def test_parallel_matches_serial_for_stored_and_patched_snapshots(tmp_path):
+    store = SnapshotStore(tmp_path)
+    version = {'members': 1, 'projects': 1}
+    store.save(make_snapshot(0, version))
+    stored = store.load(version)
+    assert stored.path is not None
+    group_ids = list(stored.group_ids)
+    expected = RecommendService._rank_groups(group_ids, 0.7, 0.3, stored)
+    assert rank_groups_parallel(group_ids, 0.7, 0.3, stored, workers=2) == expected
+
+    # 增量更新后数据版本号可能不变，子进程不能按版本号加载到旧内容
+    patched = stored.with_members(make_snapshot(1, version).groups(), stored.data_version)
+    assert patched.path is None
+    expected = RecommendService._rank_groups(group_ids, 0.7, 0.3, patched)
+    assert rank_groups_parallel(group_ids, 0.7, 0.3, patched, workers=2) == expected
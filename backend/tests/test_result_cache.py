@@ -0,0 +1,27 @@
+from recommend.result_cache import ResultCache
+
+
+def test_new_snapshot_serial_invalidates_entries():
+    cache = ResultCache()
+    cache.put(1, 'group', 'partial')
+    assert cache.get(1, 'group') == 'partial'
+    assert cache.get(2, 'group') is None
+    cache.put(2, 'group', 'complete')
+    assert cache.get(2, 'group') == 'complete'
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_results_from_older_snapshot_are_dropped():
+    cache = ResultCache()
+    cache.put(3, 'group', 'new')
+    cache.put(2, 'group', 'old')
+    assert cache.get(3, 'group') == 'new'
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_size=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(1, key, key)
+    assert cache.get(1, 'a') is None
+    assert cache.get(1, 'c') == 'c'
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,24 @@
+from utils.skill_taxonomy import KeywordMatcher, get_skill_taxonomy
+
+
+def test_terms_ending_in_symbols_match():
+    assert get_skill_taxonomy().find_skills("i know c++ and c# well") == ['C++', 'C#']
+    assert get_skill_taxonomy().find_skills("Python, C++.") == ['Python', 'C++']
+
+
+def test_dot_js_frameworks_do_not_imply_javascript():
+    assert get_skill_taxonomy().find_skills("Vue.js, Next.js and Node.js") == ['Vue.js', 'Next.js', 'Node.js']
+
+
+def test_google_cloud_does_not_imply_cloud_computing():
+    assert get_skill_taxonomy().find_skills("Google Cloud") == ['Google Cloud']
+
+
+def test_short_term_after_dot_is_ignored():
+    matcher = KeywordMatcher(['js', 'node.js'])
+    assert matcher.find("node.js") == {'node.js'}
+    assert matcher.find("js and node.js") == {'js', 'node.js'}
+
+
+def test_prefix_terms_are_implied():
+    assert get_skill_taxonomy().find_skills("react native") == ['React', 'React Native']
@@ -0,0 +1,175 @@
+import abc
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_blob_key(key):
+    """是否为合法的 SHA-256 十六进制摘要（路由参数先校验，避免路径穿越）"""
+    return bool(key) and bool(_SHA256.match(key))
+
+
+class BlobStore(abc.ABC):
+    """
+    按内容寻址的二进制文件存储：键为内容的 SHA-256，相同内容只存一份
+    接口只包含写入、读取、判断存在、删除和遍历；以后换成对象存储时实现同样的方法即可
+    存储本身不记录引用关系，是否还被引用由调用方（project/dao.py）检查后再删除
+    """
+
+    @abc.abstractmethod
+    def put(self, data):
+        """
+        写入内容；内容已存在时只刷新最近写入时间
+        Returns:
+            (sha256, size)
+        """
+
+    def put_file(self, path):
+        """写入本地文件的内容，返回 (sha256, size)"""
+        with open(path, 'rb') as f:
+            return self.put(f.read())
+
+    @abc.abstractmethod
+    def open(self, key):
+        """以二进制只读方式打开，不存在时抛出 FileNotFoundError"""
+
+    @abc.abstractmethod
+    def exists(self, key):
+        """内容是否存在"""
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """删除内容，返回是否确实删除了（不存在时返回 False）"""
+
+    @abc.abstractmethod
+    def modified_at(self, key):
+        """最近写入时间（Unix 时间戳），不存在时返回 None"""
+
+    @abc.abstractmethod
+    def list_blobs(self):
+        """遍历所有内容，逐个返回 (sha256, 最近写入时间)"""
+
+    def local_path(self, key):
+        """内容所在的本地文件路径（可直接交给 send_file 处理 Range 请求）；不在本地磁盘时返回 None"""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """本地磁盘实现：<目录>/<前两位>/<完整摘要>，先写临时文件再改名，读取方不会看到写了一半的文件"""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        if not is_blob_key(key):
+            raise ValueError(f'非法的 blob 键: {key!r}')
+        return os.path.join(self.directory, key[:2], key)
+
+    def _touch(self, path):
+        """已存在的内容再次写入时刷新修改时间，清理时据此跳过可能属于未提交上传的 blob"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def put(self, data):
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if not self._touch(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return key, len(data)
+
+    def put_file(self, path):
+        """边读边算摘要，大文件不整体读入内存"""
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        key = digest.hexdigest()
+        target = self._path(key)
+        if not self._touch(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.tmp-')
+            os.close(fd)
+            try:
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, target)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return key, size
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def exists(self, key):
+        return is_blob_key(key) and os.path.exists(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def modified_at(self, key):
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def list_blobs(self):
+        for prefix in sorted(os.listdir(self.directory)):
+            directory = os.path.join(self.directory, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                # 跳过写了一半的临时文件
+                if not is_blob_key(name):
+                    continue
+                try:
+                    yield name, os.path.getmtime(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+
+    def local_path(self, key):
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+
+_blob_store = None
+
+
+def configure_blob_store(directory):
+    """配置项目 PDF 等文件的存储目录（应用启动时调用）"""
+    global _blob_store
+    _blob_store = LocalBlobStore(directory)
+    return _blob_store
+
+
+def get_blob_store():
+    """当前的 blob 存储；未配置时使用 backend/blob_store 目录"""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = LocalBlobStore(
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blob_store')
+        )
+    return _blob_store
@@ -0,0 +1,47 @@
+import hashlib
+import json
+from datetime import timedelta, timezone
+
+from flask import request, Response
+from werkzeug.http import is_resource_modified
+
+from utils.data_version_utils import get_data_version_markers
+
+AUSTRALIA_TZ = timezone(timedelta(hours=10))  # 数据库中的无时区时间按澳洲东部时间保存
+
+
+def check_not_modified(*scopes):
+    """
+    条件 GET：根据相关数据范围的版本号生成 ETag、根据最近写入时间生成 Last-Modified
+    只查一次 data_versions 表，客户端缓存仍然有效时直接返回 304，不执行列表查询
+    ETag 包含请求路径和查询参数，fields / limit / cursor 不同的响应互不混淆
+    Args:
+        scopes: 响应内容依赖的数据范围
+    Returns:
+        (response, validators): 未修改时 response 为 304 响应；否则 response 为 None，
+        validators 交给 apply_validators 设置到正常响应上
+    """
+    versions, updated_at = get_data_version_markers(scopes)
+    key = json.dumps([request.path, sorted(request.args.items(multi=True)), sorted(versions.items())])
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    last_modified = None
+    if updated_at is not None:
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=AUSTRALIA_TZ)
+        last_modified = updated_at.astimezone(timezone.utc)
+    validators = (etag, last_modified)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return apply_validators(Response(status=304), validators), validators
+    return None, validators
+
+
+def apply_validators(response, validators):
+    """设置 ETag / Last-Modified，并要求浏览器每次使用缓存前先向服务器验证"""
+    etag, last_modified = validators
+    # 同一版本下 JSON 内容相同，但不保证逐字节一致（例如序列化顺序），使用弱 ETag
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
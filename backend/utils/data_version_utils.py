@@ -0,0 +1,70 @@
+from models.data_version import DataVersion
+from models.user import db
+from utils.time_utils import get_australia_time
+
+# 数据范围
+MEMBERS = 'members'    # 组成员及其技能（简历上传、建组、删组）
+PROJECTS = 'projects'  # 项目（上传、更新、删除）
+RECOMMENDATIONS = 'recommendations'  # 保存的推荐分数（group_project_recommendation 表）
+PROFILES = 'profiles'  # 组成员的展示信息（姓名、专业、技能原文），只影响组列表的显示，不影响推荐计算
+
+ALL_SCOPES = (MEMBERS, PROJECTS, RECOMMENDATIONS, PROFILES)
+SNAPSHOT_SCOPES = (MEMBERS, PROJECTS)  # 推荐计算快照依赖的范围（推荐分数的写入不影响快照）
+
+
+def ensure_data_versions():
+    """确保每个范围都有一行版本记录（应用启动时调用）"""
+    existing = {row.scope for row in DataVersion.query.all()}
+    for scope in ALL_SCOPES:
+        if scope not in existing:
+            db.session.add(DataVersion(scope=scope, version=0))
+    db.session.commit()
+
+
+def bump_data_version(*scopes):
+    """
+    递增指定范围的版本号，与业务写入处于同一事务，由调用方提交
+    Returns:
+        dict: {scope: 新版本号}
+    """
+    new_versions = {}
+    # 不触发自动 flush：业务写入的约束错误应留到调用方提交时再处理
+    with db.session.no_autoflush:
+        for scope in scopes:
+            updated = DataVersion.query.filter_by(scope=scope).update(
+                {DataVersion.version: DataVersion.version + 1, DataVersion.updated_at: get_australia_time()},
+                synchronize_session=False
+            )
+            if not updated:
+                db.session.add(DataVersion(scope=scope, version=1))
+                new_versions[scope] = 1
+            else:
+                new_versions[scope] = db.session.query(DataVersion.version).filter_by(scope=scope).scalar()
+    return new_versions
+
+
+def get_data_versions(scopes=SNAPSHOT_SCOPES):
+    """一次查询取出指定范围（默认为推荐快照依赖的范围）的当前版本号，返回 {scope: version}"""
+    versions = {scope: 0 for scope in scopes}
+    rows = db.session.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(scopes)).all()
+    for scope, version in rows:
+        versions[scope] = version
+    return versions
+
+
+def get_data_version_markers(scopes):
+    """
+    一次查询取出指定范围的版本号和最后修改时间
+    Returns:
+        (versions, updated_at): {scope: version}、这些范围中最近一次写入的时间（没有记录时为 None）
+    """
+    versions = {scope: 0 for scope in scopes}
+    updated_at = None
+    rows = db.session.query(DataVersion.scope, DataVersion.version, DataVersion.updated_at).filter(
+        DataVersion.scope.in_(scopes)
+    ).all()
+    for scope, version, row_updated_at in rows:
+        versions[scope] = version
+        if row_updated_at is not None and (updated_at is None or row_updated_at > updated_at):
+            updated_at = row_updated_at
+    return versions, updated_at
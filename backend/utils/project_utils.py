@@ -104,4 +104,73 @@ def parse_project_pdf(file_path, filename):
         'groupCapacity': str(result['groupCapacity']) if result['groupCapacity'] else "1",
         'projectRequirements': result['projectRequirements'] or '未填写',
         'requiredSkills': result['requiredSkills'] or '未填写',
-    } 
\ No newline at end of file
+    } 
+
+def _parse_project_file(item):
+    """子进程任务：解析单个文件，异常转为错误信息返回，不影响同批其他文件"""
+    file_path, filename = item
+    try:
+        return parse_project_pdf(file_path, filename), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+_parse_workers = 1  # 批量上传时解析文件的进程数上限
+_parse_executor = None
+
+
+def process_pool_context():
+    """
+    子进程池使用的启动方式：forkserver（不支持时用 spawn），不从多线程的 Web 服务进程直接 fork，
+    子进程不会继承其他线程（推荐后台线程、数据库连接池）持有的锁
+    """
+    import multiprocessing
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def configure_parse_workers(workers):
+    """配置批量上传时解析项目文件的进程数上限（应用启动时调用）；进程池在第一次批量解析时创建，之后一直复用"""
+    global _parse_workers, _parse_executor
+    _parse_workers = max(1, int(workers))
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False)
+        _parse_executor = None
+
+
+def _get_parse_executor():
+    global _parse_executor
+    if _parse_executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _parse_executor = ProcessPoolExecutor(max_workers=_parse_workers, mp_context=process_pool_context())
+    return _parse_executor
+
+
+def parse_project_files(items):
+    """
+    批量解析项目文件，文件较多时在有上限的进程池中并行解析（PDF 解析是 CPU 密集的纯计算，不访问数据库）
+    Args:
+        items: [(file_path, filename)]
+    Returns:
+        与 items 顺序一致的 [(info, error)]，解析失败时 info 为 None、error 为错误信息
+    """
+    global _parse_executor
+    from concurrent.futures.process import BrokenProcessPool
+
+    items = list(items)
+    if _parse_workers <= 1 or len(items) <= 1:
+        return [_parse_project_file(item) for item in items]
+    futures = [_get_parse_executor().submit(_parse_project_file, item) for item in items]
+    results = []
+    broken = False
+    for future in futures:
+        try:
+            results.append(future.result())
+        except BrokenProcessPool as e:
+            # 子进程异常退出（如解析库崩溃），本批未完成的文件记为失败，下次请求重建进程池
+            broken = True
+            results.append((None, f"{type(e).__name__}: {e}"))
+    if broken:
+        _parse_executor.shutdown(wait=False)
+        _parse_executor = None
+    return results
@@ -0,0 +1,60 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+from flask import request
+
+
+def parse_page_args():
+    """
+    解析分页参数 limit / cursor（游标为上一页返回的 nextCursor，含义由各接口决定：排名偏移量或最后一条的ID）
+    Returns:
+        (limit, cursor, error): limit 为 None 表示不分页，cursor 未传时为 None；参数不合法时 error 为错误信息
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    try:
+        limit = int(limit) if limit not in (None, '') else None
+        cursor = int(cursor) if cursor not in (None, '') else None
+    except ValueError:
+        return None, None, 'limit 和 cursor 必须是整数'
+    if (limit is not None and limit <= 0) or (cursor is not None and cursor < 0):
+        return None, None, 'limit 必须大于0，cursor 不能为负数'
+    return limit, cursor, None
+
+
+def parse_fields(allowed):
+    """
+    解析字段投影参数 fields（逗号分隔的返回字段名）
+    Args:
+        allowed: 接口支持的字段名
+    Returns:
+        (fields, error): fields 为所选字段集合，未传时为 None（返回全部字段）；有未知字段时 error 为错误信息
+    """
+    value = request.args.get('fields')
+    if value in (None, ''):
+        return None, None
+    fields = {f.strip() for f in value.split(',') if f.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        return None, f"不支持的字段: {', '.join(sorted(unknown))}"
+    return fields, None
+
+
+def parse_since_arg():
+    """
+    解析增量同步参数 since（ISO 8601 时间，如上次返回的 syncedAt；不带时区时按澳洲东部时间）
+    Returns:
+        (since, error): since 为无时区的澳洲时间（与数据库中的时间一致），未传时为 None
+    """
+    value = request.args.get('since')
+    if value in (None, ''):
+        return None, None
+    try:
+        # 查询串中未编码的 '+' 会被解码成空格，还原时区偏移前的 '+'
+        value = re.sub(r'(:\d{2}(?:\.\d+)?) (\d{2}:?\d{2})$', r'\1+\2', value.strip())
+        since = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None, 'since 必须是 ISO 8601 格式的时间，如 2024-07-01T22:34:56+10:00'
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone(timedelta(hours=10))).replace(tzinfo=None)
+    return since, None
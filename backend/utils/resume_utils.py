@@ -3,6 +3,7 @@ from docx import Document
 import pdfplumber
 import re
 from typing import Dict
+from utils.skill_taxonomy import get_skill_taxonomy
 
 def extract_text_from_pdf(file) -> str:
     with pdfplumber.open(file) as pdf:
@@ -89,7 +90,6 @@ def extract_info_from_text(text):
     }
     import re
     email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}'
-    skill_keywords = ['python', 'java', 'c++', 'c#', 'sql', 'html', 'css', 'js', 'javascript', 'machine learning', 'deep learning', 'data analysis', 'frontend', 'backend', 'linux', 'git', 'docker', 'cloud', 'tensorflow', 'pytorch']
     major_keywords = ['computer science', 'software', 'engineering', 'information', 'automation', 'electrical', 'mathematics', 'physics', 'ai', 'artificial intelligence', 'data science', 'cybersecurity', 'network', 'informatics']
 
     # 全局找邮箱
@@ -136,13 +136,14 @@ def extract_info_from_text(text):
                     break
             if info['major']:
                 break
-    # 启发式补全技能
+    # 启发式补全技能：按技能分类词表匹配，别名归并为规范技能名
     if not info['skill']:
+        taxonomy = get_skill_taxonomy()
         found_skills = []
         for l in lines:
-            for kw in skill_keywords:
-                if kw in l.lower() and kw not in found_skills:
-                    found_skills.append(kw)
+            for skill in taxonomy.find_skills(l):
+                if skill not in found_skills:
+                    found_skills.append(skill)
         if found_skills:
             info['skill'] = ','.join(found_skills)
     return info 
\ No newline at end of file
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect, text
+from models.user import db
+
+
+def add_missing_columns():
+    """
+    为已存在的表补齐模型中新增的列和索引
+    db.create_all 只会建新表，不会修改已有表；新增列均为可空列，直接 ALTER TABLE ADD COLUMN
+    Returns:
+        list: 新增的 "表.列" / "表.索引" 名称
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    quote = db.engine.dialect.identifier_preparer.quote
+    added = []
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type} NULL"))
+                added.append(f"{table.name}.{column.name}")
+            existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    added.append(f"{table.name}.{index.name}")
+    if added:
+        print(f"已为现有表补充新列或索引: {', '.join(added)}")
+    return added
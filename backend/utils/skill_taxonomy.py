@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+TAXONOMY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+
+
+def _ends_term(term, i):
+    """term 的前 i 个字符作为一个词时，第 i 个字符是否满足结尾条件（后面不是单词字符）"""
+    return not re.match(r"\w", term[i])
+
+
+class KeywordMatcher:
+    """
+    关键词匹配器：把整张词表编译成一个带边界条件的交替正则，
+    对一段文本只扫描一遍即可找出全部命中的关键词
+    边界用 (?<!\\w) / (?!\\w) 而不是 \\b：c++、c# 这类以非单词字符结尾的词后面不存在 \\b；
+    另外不在 “单词.” 之后开始匹配，vue.js、node.js 中的 js 不单独算作一个词
+    """
+
+    def __init__(self, keywords):
+        """
+        Args:
+            keywords: 关键词序列；元素为字符串，或 (匹配词, 返回名) 二元组（别名归并到规范名）
+        """
+        # 小写匹配词 -> 返回名（重复的匹配词保留首次出现的）
+        self._names = {}
+        for kw in keywords:
+            term, name = (kw, kw) if isinstance(kw, str) else kw
+            self._names.setdefault(term.lower(), name)
+
+        # 长词优先，保证同一起点上命中的是最长的关键词
+        terms = sorted(self._names, key=len, reverse=True)
+        alternation = "|".join(re.escape(t) for t in terms)
+        # 前瞻不消耗字符，finditer 会在每个位置尝试一次
+        self._pattern = re.compile(rf"(?<!\w)(?<!\w\.)(?=({alternation})(?!\w))")
+
+        # 同一起点命中长词时，作为其前缀且边界同样成立的短词也一并命中（如 react native -> react）
+        self._implied = {
+            t: [s for s in terms if len(s) < len(t) and t.startswith(s) and _ends_term(t, len(s))]
+            for t in terms
+        }
+
+    def find(self, text):
+        """返回文本（需已转小写）中命中的所有关键词（返回名）集合"""
+        found = set()
+        for m in self._pattern.finditer(text):
+            term = m.group(1)
+            found.add(self._names[term])
+            for s in self._implied[term]:
+                found.add(self._names[s])
+        return found
+
+
+@lru_cache(maxsize=None)
+def get_keyword_matcher(keywords):
+    """按词表缓存匹配器，同一词表只编译一次（keywords 需为元组）"""
+    return KeywordMatcher(keywords)
+
+
+class SkillTaxonomy:
+    """
+    技能分类词表
+    每个规范技能有整数 id（即技能向量中的列号）、分类和别名；
+    别名匹配后归并到规范技能，同义词不再占用多个维度
+    """
+
+    def __init__(self, data):
+        skills = sorted(data['skills'], key=lambda s: s['id'])
+        if [s['id'] for s in skills] != list(range(len(skills))):
+            raise ValueError('技能 id 必须从 0 开始连续编号')
+        self.skills = skills
+        self.names = [s['name'] for s in skills]  # 按 id 排列的规范技能名
+        self.ids = {s['name']: s['id'] for s in skills}  # {规范技能名: id}
+        self.categories = {s['name']: s.get('category', '') for s in skills}  # {规范技能名: 分类}
+        if len(self.ids) != len(skills):
+            raise ValueError('技能名重复')
+
+        # (匹配词, 规范名)：规范名本身及其所有别名
+        terms = []
+        for s in skills:
+            terms.append((s['name'], s['name']))
+            terms.extend((alias, s['name']) for alias in s.get('aliases', []))
+        self.terms = tuple(terms)
+        self._canonical = {term.lower(): name for term, name in terms}  # {小写匹配词: 规范名}
+        if len(self._canonical) != len(terms):
+            raise ValueError('技能名或别名重复')
+
+        # 版本号：词表内容（id、名称、别名）变化时随之变化，用于让缓存或保存的技能向量失效
+        self.version = hashlib.sha1(
+            json.dumps(
+                [[s['id'], s['name'], s.get('aliases', [])] for s in skills], ensure_ascii=False
+            ).encode('utf-8')
+        ).hexdigest()[:16]
+
+    def canonical(self, term):
+        """技能名或别名 -> 规范技能名，不在词表中时返回 None"""
+        return self._canonical.get(term.lower())
+
+    def find_skills(self, text):
+        """找出文本中出现的技能（规范名），按 id 排序"""
+        found = get_keyword_matcher(self.terms).find((text or '').lower())
+        return sorted(found, key=self.ids.get)
+
+
+@lru_cache(maxsize=None)
+def get_skill_taxonomy(path=TAXONOMY_FILE):
+    """加载技能分类词表（每个文件只加载一次）"""
+    with open(path, encoding='utf-8') as f:
+        return SkillTaxonomy(json.load(f))
@@ -16,6 +16,7 @@ import {
 } from "@mui/material";
 import CloseIcon from "@mui/icons-material/Close";
 import { useLocation, useNavigate } from "react-router-dom"; 
+import backendURL from "../backendURL";
 
 export default function ProjectSingle({ project, delay = 0 }) {
   const [open, setOpen] = useState(false);
@@ -25,17 +26,26 @@ export default function ProjectSingle({ project, delay = 0 }) {
   const handleClose = () => setOpen(false);
 
   const navigate = useNavigate();
-  const handleCheckDetails = () => {
-    if (project.pdf) {
-      // window.open(backendURL + project.pdfFile, "_blank");
-      const binary = atob(project.pdf);
-      const uint8 = new Uint8Array(binary.length);
-      for (let i = 0; i < binary.length; i++) {
-        uint8[i] = binary.charCodeAt(i);
+  const handleCheckDetails = async () => {
+    if (project.pdfUrl) {
+      // PDF is no longer embedded in the project list; download it on demand
+      try {
+        const res = await fetch(backendURL + project.pdfUrl, {
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`,
+            "ngrok-skip-browser-warning": "true",
+          }
+        });
+        if (!res.ok) {
+          throw new Error('Network response was not ok');
+        }
+        const uint8 = new Uint8Array(await res.arrayBuffer());
+        navigate("/pdf-viewer", {
+          state: { pdfData: uint8}
+        });
+      } catch (error) {
+        console.error('Failed to load PDF:', error);
       }
-      navigate("/pdf-viewer", {
-        state: { pdfData: uint8}
-      });
     }
   };
 
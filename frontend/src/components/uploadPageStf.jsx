@@ -70,7 +70,11 @@ export default function UploadStf() {
         });
         if (!res.ok) throw new Error("Upload failed: " + res.status);
         const data = await res.json();
-        // 后端返回 { status:"200", projects: [ ... ] }
+        // 后端返回 { status:"200", projects: [ ... ], results: [ 逐文件结果 ] }，只有解析成功的文件在 projects 中
+        const failed = (data.results || []).filter(r => r.status !== "ok");
+        if (failed.length) {
+            alert("Some files could not be imported:\n" + failed.map(r => `${r.filename}: ${r.error}`).join("\n"));
+        }
         return data.projects;
     };
 